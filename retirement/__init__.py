@@ -1,6 +1,13 @@
-import argparse
+"""
+Command line entry points.
+
+Everything beyond argparse is imported inside the command that needs it, so
+``import retirement`` and ``--help`` stay fast and a command only pays for the
+data sets, process pools and sockets it actually uses.
+"""
 
-from retirement.simulation import MonteCarlo, Run
+import argparse
+import os
 
 
 def get_parser():
@@ -14,11 +21,35 @@ def get_parser():
     return parser
 
 
+def get_batch_parser():
+    from retirement.simulation import RUNS_PER_SIMULATION
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source", help="CSV or JSONL file of households.")
+    parser.add_argument(
+        "output", help="JSONL results file, appended to and resumed from."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of worker processes."
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=RUNS_PER_SIMULATION,
+        help="Monte Carlo runs per household.",
+    )
+    return parser
+
+
 def run():
     # print(args)
+    import logging
+
+    from retirement.simulation import Run
 
     parser = get_parser()
     args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
 
     run1 = Run(args.age, args.taxable, args.ira, args.roth)
     run1.process()
@@ -29,9 +60,130 @@ def run():
 
 
 def monte_carlo():
+    from retirement.mortality import FEMALE, MALE, Lifespan
+    from retirement.policy import GuardrailPolicy
+    from retirement.sampling import PLAIN, SAMPLERS
+    from retirement.simulation import RUNS_PER_SIMULATION, MonteCarlo
+
     parser = get_parser()
+    parser.add_argument(
+        "--runs", type=int, default=RUNS_PER_SIMULATION, help="Number of runs."
+    )
+    parser.add_argument(
+        "--sampling",
+        choices=sorted(SAMPLERS),
+        default=PLAIN,
+        help="How the yearly returns are sampled.",
+    )
+    parser.add_argument("--seed", type=int, help="Seed for reproducible runs.")
+    parser.add_argument(
+        "--lifespan",
+        nargs="+",
+        choices=[MALE, FEMALE],
+        help="Sex of each household member, samples a lifespan per run.",
+    )
+    parser.add_argument(
+        "--stop-at-death",
+        action="store_true",
+        help="Don't simulate past the sampled lifespan.",
+    )
+    parser.add_argument(
+        "--checkpoint", help="File to save progress to and resume from."
+    )
+    parser.add_argument(
+        "--time-budget", type=float, help="Stop after this many seconds."
+    )
+    parser.add_argument(
+        "--guardrails",
+        action="store_true",
+        help="Adjust spending with guardrails on the withdrawal rate.",
+    )
+    parser.add_argument(
+        "--sensitivity",
+        action="store_true",
+        help="Report the effect of changing each input instead.",
+    )
+    parser.add_argument(
+        "--coordinate",
+        metavar="HOST:PORT",
+        help="Listen here and hand the runs out to retirement-worker processes.",
+    )
+    parser.add_argument(
+        "--shard-timeout",
+        type=float,
+        help="With --coordinate, seconds a worker gets per shard before it's "
+        "treated as dead, 600 by default.",
+    )
     args = parser.parse_args()
+    authkey = get_authkey(parser) if args.coordinate else None
+
+    mc = MonteCarlo(
+        args.age,
+        args.taxable,
+        args.ira,
+        args.roth,
+        runs=args.runs,
+        sampling=args.sampling,
+        seed=args.seed,
+        lifespan=Lifespan(args.lifespan) if args.lifespan else None,
+        full_horizon=not args.stop_at_death,
+        policy=GuardrailPolicy() if args.guardrails else None,
+    )
+    if args.sensitivity:
+        from retirement.sensitivity import Sensitivity
+
+        sensitivity = Sensitivity(mc)
+        sensitivity.start()
+        sensitivity.print_report()
+        return
+    if args.coordinate:
+        from retirement.distributed import SHARD_TIMEOUT, Coordinator, parse_address
 
-    mc = MonteCarlo(args.age, args.taxable, args.ira, args.roth)
-    mc.start()
+        coordinator = Coordinator(
+            mc,
+            parse_address(args.coordinate),
+            authkey=authkey,
+            shard_timeout=args.shard_timeout or SHARD_TIMEOUT,
+        )
+        coordinator.start().report()
+        return
+    mc.start(checkpoint=args.checkpoint, time_budget=args.time_budget)
     mc.report()
+
+
+def get_authkey(parser):
+    """
+    The key coordinators and workers share, from ``RETIREMENT_AUTHKEY``.
+
+    The messages are pickled, so anyone who knows the key can run code on the
+    other end.  There is deliberately no default, and ``parser`` exits with an
+    error when the variable isn't set.
+    """
+    authkey = os.environ.get("RETIREMENT_AUTHKEY")
+    if not authkey:
+        parser.error("set RETIREMENT_AUTHKEY to a secret shared with the workers")
+    return authkey.encode()
+
+
+def worker():
+    from retirement.distributed import parse_address, run_worker
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "address", metavar="HOST:PORT", help="Address of the coordinator."
+    )
+    args = parser.parse_args()
+    authkey = get_authkey(parser)
+
+    shards = run_worker(parse_address(args.address), authkey=authkey)
+    print(f"Simulated {shards} shards.")
+
+
+def evaluate_batch():
+    from retirement.batch import run_batch
+
+    parser = get_batch_parser()
+    args = parser.parse_args()
+
+    evaluated = run_batch(args.source, args.output, args.workers, args.runs)
+    print(f"Evaluated {evaluated} households.")
@@ -2,7 +2,14 @@ from dataclasses import dataclass
 
 from .tax import CAPITAL_TAX, REGULAR_TAX
 
+ACCOUNTS = ("taxable", "ira", "roth")
+
+# Income yield of each asset.  Stock dividends are qualified and taxed as capital
+# gains, bond and cash interest is taxed as regular income.  Cash has no price
+# changes, so its interest is also its whole return.
 DIVIDEND_RATE = 0.015
+BOND_YIELD = 0.035
+CASH_RATE = 0.03
 
 RMD = {
     72: 27.4,
@@ -39,6 +46,27 @@ RMD = {
 }
 
 
+def holdings_income(balance, portfolio):
+    """
+    Taxable income thrown off by ``balance`` invested in ``portfolio``.
+
+    Returns:
+        tuple: The (capital, regular) income.
+    """
+    capital = balance * portfolio.get("stocks", 0) * DIVIDEND_RATE
+    regular = balance * (
+        portfolio.get("bonds", 0) * BOND_YIELD + portfolio.get("cash", 0) * CASH_RATE
+    )
+    return capital, regular
+
+
+def required_distribution(balance, age):
+    """The RMD that has to come out of an IRA at ``age``."""
+    if age in RMD:
+        return balance / RMD[age]
+    return 0
+
+
 class BaseAccount:
     TAX_TYPE = REGULAR_TAX
 
@@ -46,21 +74,21 @@ class BaseAccount:
         self.balance = balance
 
     def forced(self, age):
+        """The distribution the account forces out at ``age``."""
         return 0
 
 
 class TaxableAccount(BaseAccount):
     TAX_TYPE = CAPITAL_TAX
 
-    def forced(self, age):
-        return self.balance * DIVIDEND_RATE
+    def income(self, portfolio):
+        """The (capital, regular) income of the balance held in ``portfolio``."""
+        return holdings_income(self.balance, portfolio)
 
 
 class IRAAccount(BaseAccount):
     def forced(self, age):
-        if age in RMD:
-            return self.balance / RMD[age]
-        return 0
+        return required_distribution(self.balance, age)
 
 
 class RothAccount(BaseAccount):
@@ -77,6 +105,15 @@ class Accounts:
     def net_worth(self):
         return int(sum([a.balance for a in (self.taxable, self.ira, self.roth)]))
 
+    @property
+    def is_depleted(self):
+        """
+        A household with no net worth is out of money.  A negative account is money
+        borrowed from the others, so the household is treated as failed from here
+        even if the accounts' own allocations could later pull it back above zero.
+        """
+        return sum(a.balance for a in (self.taxable, self.ira, self.roth)) <= 0
+
     @property
     def balances(self):
         return {
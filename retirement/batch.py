@@ -0,0 +1,204 @@
+"""
+Evaluate a book of households streamed from a CSV or JSONL file.
+
+Every input record is a household: the starting age and balances, plus any
+``Plan`` overrides (expenses, social security).  Each household gets its own
+``MonteCarlo`` and one JSON line is written per record, in input order.  A
+record that can't be parsed or evaluated gets an ``error`` line instead, so one
+bad record doesn't stop the rest of the book.  The output file doubles as the resume
+point; on restart the records that already have an output line are skipped.
+"""
+
+import csv
+import json
+import math
+import os
+from itertools import islice
+from pathlib import Path
+
+from .simulation import RUNS_PER_SIMULATION, MonteCarlo
+from .year import Plan
+
+REQUIRED_FIELDS = ("age", "taxable", "ira", "roth")
+PLAN_FIELDS = {
+    "need_expenses": float,
+    "want_expenses": float,
+    "aca_premiums": float,
+    "medicare_premiums": float,
+    "ss_amount": float,
+    "ss_age": int,
+}
+OPTIONAL_FIELDS = {"id": str, "runs": int}
+
+CHUNK_SIZE = 64
+# Bytes read at a time when counting the records already written.
+READ_SIZE = 1 << 20
+
+
+def read_households(path):
+    """
+    Lazily yield the raw household records from ``path``.
+
+    Files ending in ``.csv`` are read with a header row, anything else is
+    treated as JSONL.  Blank lines and blank CSV cells are skipped.  A line that
+    isn't valid JSON is yielded as is, for ``parse_household`` to reject.
+    """
+    path = Path(path)
+    with path.open(newline="") as fh:
+        if path.suffix.lower() == ".csv":
+            for row in csv.DictReader(fh):
+                yield {k: v for k, v in row.items() if v not in (None, "")}
+        else:
+            for line in fh:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        yield line.strip()
+
+
+def parse_household(record):
+    """
+    Convert a raw record into keyword arguments for ``evaluate_household``.
+
+    Raises:
+        ValueError: if the record isn't a mapping of fields, a required field is
+            missing, an unknown field is present, a value has the wrong type or
+            isn't a finite number, or ``runs`` is less than 1.
+    """
+    if not isinstance(record, dict):
+        raise ValueError(f"household record is not an object: {record!r}")
+    missing = [f for f in REQUIRED_FIELDS if f not in record]
+    if missing:
+        raise ValueError(f"household record missing {missing}: {record}")
+    unknown = set(record) - set(REQUIRED_FIELDS) - set(PLAN_FIELDS)
+    unknown -= set(OPTIONAL_FIELDS)
+    if unknown:
+        raise ValueError(f"household record has unknown fields {sorted(unknown)}")
+
+    try:
+        household = {
+            "age": int(record["age"]),
+            "taxable": float(record["taxable"]),
+            "ira": float(record["ira"]),
+            "roth": float(record["roth"]),
+            "plan": {k: t(record[k]) for k, t in PLAN_FIELDS.items() if k in record},
+        }
+        for key, type_ in OPTIONAL_FIELDS.items():
+            if key in record:
+                household[key] = type_(record[key])
+    except (TypeError, OverflowError) as e:
+        raise ValueError(f"household record has a value of the wrong type: {e}") from e
+    numbers = [household[k] for k in ("taxable", "ira", "roth")]
+    numbers += household["plan"].values()
+    if not all(math.isfinite(number) for number in numbers):
+        raise ValueError(f"household record has a value that isn't finite: {record}")
+    if household.get("runs", 1) < 1:
+        raise ValueError(f"household record needs at least 1 run: {record}")
+    return household
+
+
+def evaluate_household(household, runs=RUNS_PER_SIMULATION):
+    """Run the Monte Carlo for one parsed household and return its summary."""
+    mc = MonteCarlo(
+        household["age"],
+        household["taxable"],
+        household["ira"],
+        household["roth"],
+        plan=Plan(**household["plan"]),
+        runs=household.get("runs", runs),
+    )
+    mc.start()
+    result = {}
+    if "id" in household:
+        result["id"] = household["id"]
+    result.update(mc.summary())
+    return result
+
+
+def _evaluate(item):
+    index, record, runs = item
+    result = {"index": index}
+    try:
+        household = parse_household(record)
+        result.update(evaluate_household(household, runs))
+    except Exception as e:
+        # One bad household mustn't stop the book, or a resume would stop at
+        # the same record again.
+        if isinstance(record, dict) and "id" in record:
+            result["id"] = str(record["id"])
+        result["error"] = str(e) if isinstance(e, ValueError) else repr(e)
+    return result
+
+
+def completed_records(output):
+    """
+    Return the number of records already written to ``output``.
+
+    A trailing partial line, left behind by a crash mid-write, is truncated so
+    the record is evaluated again.  The file is read ``READ_SIZE`` bytes at a
+    time, and only its tail is searched for a partial line.
+    """
+    output = Path(output)
+    if not output.exists():
+        return 0
+    with output.open("rb+") as fh:
+        size = fh.seek(0, os.SEEK_END)
+        # Back up to just past the last newline.
+        end = size
+        while end:
+            start = max(end - READ_SIZE, 0)
+            fh.seek(start)
+            newline = fh.read(end - start).rfind(b"\n")
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        if end != size:
+            fh.truncate(end)
+        fh.seek(0)
+        return sum(
+            chunk.count(b"\n") for chunk in iter(lambda: fh.read(READ_SIZE), b"")
+        )
+
+
+def run_batch(
+    source, output, workers=1, runs=RUNS_PER_SIMULATION, chunk_size=CHUNK_SIZE
+):
+    """
+    Evaluate every household in ``source`` and append the results to ``output``.
+
+    Records are pulled from the input ``chunk_size`` per worker at a time so
+    memory stays bounded regardless of the size of the book, and each chunk is
+    flushed before the next one is read.
+
+    Returns:
+        int: The number of records evaluated by this call.
+    """
+    skip = completed_records(output)
+    records = islice(read_households(source), skip, None)
+    items = ((index, record, runs) for index, record in enumerate(records, skip))
+
+    pool = None
+    if workers > 1:
+        # Only paid for when there is a pool to start.
+        import multiprocessing
+
+        pool = multiprocessing.Pool(workers)
+    evaluated = 0
+    try:
+        with Path(output).open("a") as out:
+            while True:
+                chunk = list(islice(items, chunk_size * workers))
+                if not chunk:
+                    break
+                results = pool.imap(_evaluate, chunk) if pool else map(_evaluate, chunk)
+                for result in results:
+                    out.write(json.dumps(result) + "\n")
+                out.flush()
+                evaluated += len(chunk)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return evaluated
@@ -0,0 +1,337 @@
+"""
+Spread the blocks of a MonteCarlo over worker processes on other hosts.
+
+Every block of a simulation is seeded from the seed and its index, so each one
+is a shard any worker can simulate on its own.  The coordinator sends the
+simulation to every worker that connects and then hands out shard indexes one at
+a time.  Workers send back a compact ``Aggregate`` of the shard instead of its
+runs.  Aggregates merge exactly, so the result doesn't depend on which worker
+simulated which shard.  A shard whose worker disconnects or stops answering goes
+back in the queue for the next worker.
+
+Connections use ``multiprocessing.connection``, which pickles the messages, so
+only connect workers to a coordinator you trust, with a shared authkey.
+"""
+
+import threading
+from contextlib import suppress
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from .failures import FailureDistribution
+from .records import RunRecords
+from .simulation import CONFIDENCE_Z, replicate_variance
+from .sketch import SKETCH_ACCURACY, QuantileSketch
+
+# Default key for coordinators and workers in one process tree on localhost, as
+# in the tests.  Anyone can read it, so the command line never falls back to it.
+AUTHKEY = b"retirement"
+# Seconds a worker gets to simulate a shard before it's treated as dead.  A host
+# that dies without closing its connection is only noticed this way.
+SHARD_TIMEOUT = 600
+
+# The first item of every message.
+SIMULATION = "simulation"
+SHARD = "shard"
+RESULT = "result"
+ERROR = "error"
+STOP = "stop"
+
+
+def parse_address(address):
+    """Turn ``host:port`` into a (host, port) tuple."""
+    host, _, port = address.rpartition(":")
+    return host or "localhost", int(port)
+
+
+class Aggregate:
+    """
+    Mergeable results of some blocks of ``mc``: the failure counts, the moments
+    and a quantile sketch of the ending net worths.
+    """
+
+    def __init__(self, mc, accuracy=SKETCH_ACCURACY) -> None:
+        self.knows_full_horizon = mc.knows_full_horizon
+        self.has_lifespan = mc.lifespan is not None
+        self.runs = 0
+        self.failures = 0
+        self.death_failures = 0
+        # block index -> (failures, runs), for the complete blocks
+        self.replicate_results = {}
+        # Net worths are whole dollars, so these sums are exact in any order.
+        self.total = 0
+        self.total_squares = 0
+        self.sketch = QuantileSketch(accuracy)
+        self.failure_distribution = FailureDistribution()
+
+    @classmethod
+    def of_block(cls, mc, index, accuracy=SKETCH_ACCURACY):
+        """
+        Simulate block ``index`` of ``mc`` and aggregate it.  The runs ``mc``
+        holds are replaced.
+        """
+        aggregate = cls(mc, accuracy)
+        size = mc.block_sizes()[index]
+        records = mc.records
+        mc.reset()
+        # Only room for the block, rather than for every run of the simulation.
+        mc.records = RunRecords(size)
+        mc.process_block(index, size)
+        for row in range(len(mc.records)):
+            aggregate.add_ending(mc.records.net_worth(row))
+        aggregate.failures = mc.failures
+        aggregate.death_failures = mc.death_failures
+        aggregate.failure_distribution = mc.failure_distribution
+        if mc.replicate_results:
+            aggregate.replicate_results[index] = mc.replicate_results[0]
+        mc.records = records
+        mc.reset()
+        return aggregate
+
+    def add_ending(self, net_worth):
+        self.runs += 1
+        self.total += net_worth
+        self.total_squares += net_worth**2
+        self.sketch.add(net_worth)
+
+    def merge(self, other: "Aggregate"):
+        self.runs += other.runs
+        self.failures += other.failures
+        self.death_failures += other.death_failures
+        self.replicate_results.update(other.replicate_results)
+        self.total += other.total
+        self.total_squares += other.total_squares
+        self.sketch.merge(other.sketch)
+        self.failure_distribution.merge(other.failure_distribution)
+
+    @property
+    def primary_failures(self):
+        return self.death_failures if self.has_lifespan else self.failures
+
+    def summary(self):
+        """
+        The headline numbers of ``MonteCarlo.summary``, with the percentiles
+        estimated from the sketch, and the mean and standard deviation of the
+        ending net worth.
+        """
+        if not self.runs:
+            return None
+        runs = self.runs
+        summary = {"runs": runs, "failures": None, "success_rate": None}
+        if self.knows_full_horizon:
+            summary["failures"] = self.failures
+            summary["success_rate"] = 1 - self.failures / runs
+        if self.has_lifespan:
+            summary["death_failures"] = self.death_failures
+            summary["success_rate_to_death"] = 1 - self.death_failures / runs
+
+        failure_rate = self.primary_failures / runs
+        variance = replicate_variance(
+            [self.replicate_results[i] for i in sorted(self.replicate_results)]
+        )
+        if variance is None:
+            variance = failure_rate * (1 - failure_rate) / runs
+        mean = self.total / runs
+        summary.update(
+            {
+                "standard_error": variance**0.5,
+                "mean": mean,
+                "std": max(self.total_squares / runs - mean**2, 0) ** 0.5,
+                "median": self.sketch.quantile(50),
+                "p10": self.sketch.quantile(10),
+                "p90": self.sketch.quantile(90),
+            }
+        )
+        return summary
+
+    def report(self):
+        summary = self.summary()
+        print("=======================================")
+        print(f"number of runs: {summary['runs']}")
+        if self.knows_full_horizon:
+            print(
+                f"Failures: {summary['failures']} "
+                f"[{(1 - summary['success_rate']) * 100:.2f}%]"
+            )
+        if self.has_lifespan:
+            print(
+                f"Failures before death: {summary['death_failures']} "
+                f"[{(1 - summary['success_rate_to_death']) * 100:.2f}%]"
+            )
+        print(
+            f"Failure rate: {self.primary_failures / self.runs * 100:.2f}% "
+            f"±{CONFIDENCE_Z * summary['standard_error'] * 100:.2f}%"
+        )
+        print(f"Mean Net Worth: ${summary['mean']:,.0f} (std ${summary['std']:,.0f})")
+        print(f"Median Net Worth: ~${summary['median']:,.0f}")
+        print(f"10% Net Worth: ~${summary['p10']:,.0f}")
+        print(f"90% Net Worth: ~${summary['p90']:,.0f}")
+        self.failure_distribution.report()
+
+
+def local_aggregate(mc):
+    """Aggregate every block of ``mc`` in this process."""
+    aggregate = Aggregate(mc)
+    for index in range(len(mc.block_sizes())):
+        aggregate.merge(Aggregate.of_block(mc, index))
+    return aggregate
+
+
+class Coordinator:
+    """
+    Hand out the blocks of ``mc`` as shards to the workers that connect.
+
+    Args:
+        mc: The simulation.  Its seed seeds every shard, so the result only
+            depends on it.
+        address: (host, port) to listen on, port 0 picks a free port.
+        authkey: Shared secret the workers have to present.
+        shard_timeout: Seconds to wait for a shard before its worker is treated
+            as dead.  Waits forever when None.
+    """
+
+    def __init__(
+        self,
+        mc,
+        address=("localhost", 0),
+        authkey=AUTHKEY,
+        shard_timeout=SHARD_TIMEOUT,
+    ) -> None:
+        self.mc = mc
+        self.authkey = authkey
+        self.shard_timeout = shard_timeout
+        self.listener = Listener(address, authkey=authkey)
+        self.shards = len(mc.block_sizes())
+        self.pending = list(range(self.shards))
+        # shard index -> Aggregate
+        self.results = {}
+        self.error = None
+        self.condition = threading.Condition()
+        self.threads = []
+
+    @property
+    def address(self):
+        return self.listener.address
+
+    def is_finished(self):
+        return self.error is not None or len(self.results) == self.shards
+
+    def start(self):
+        """
+        Serve workers until every shard is simulated.
+
+        Returns:
+            Aggregate: The merged result of all the shards.
+
+        Raises:
+            RuntimeError: if a worker failed to simulate a shard.
+        """
+        accepter = threading.Thread(target=self.accept, daemon=True)
+        accepter.start()
+        with self.condition:
+            self.condition.wait_for(self.is_finished)
+        # Wake the accepter up so it sees it's done.
+        with suppress(OSError), Client(self.address, authkey=self.authkey):
+            pass
+        accepter.join()
+        self.listener.close()
+        for thread in self.threads:
+            thread.join()
+
+        if self.error:
+            raise RuntimeError(f"a worker failed to simulate a shard: {self.error}")
+        aggregate = Aggregate(self.mc)
+        for index in sorted(self.results):
+            aggregate.merge(self.results[index])
+        return aggregate
+
+    def accept(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # A client with the wrong authkey or that dropped mid handshake.
+                continue
+            if self.is_finished():
+                conn.close()
+                return
+            thread = threading.Thread(target=self.serve, args=(conn,), daemon=True)
+            self.threads.append(thread)
+            thread.start()
+
+    def serve(self, conn):
+        """Feed shards to one worker until they are all done or it dies."""
+        with conn:
+            try:
+                conn.send((SIMULATION, self.mc))
+            except OSError:
+                return
+            while True:
+                index = self.next_shard()
+                if index is None:
+                    with suppress(OSError):
+                        conn.send((STOP,))
+                    return
+                try:
+                    conn.send((SHARD, index))
+                    if self.shard_timeout is not None and not conn.poll(
+                        self.shard_timeout
+                    ):
+                        raise TimeoutError(f"shard {index} timed out")
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    self.requeue(index)
+                    return
+                self.finish(message)
+
+    def next_shard(self):
+        """Wait for a shard to hand out, None once there is nothing left to do."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.pending or self.is_finished())
+            if self.is_finished():
+                return None
+            return self.pending.pop(0)
+
+    def requeue(self, index):
+        with self.condition:
+            self.pending.append(index)
+            self.condition.notify_all()
+
+    def finish(self, message):
+        with self.condition:
+            if message[0] == ERROR:
+                self.error = message[2]
+            else:
+                _, index, aggregate = message
+                self.results.setdefault(index, aggregate)
+            self.condition.notify_all()
+
+
+def run_worker(address, authkey=AUTHKEY):
+    """
+    Simulate shards for the coordinator at ``address`` until it is done.
+
+    Returns:
+        int: The number of shards simulated.
+    """
+    shards = 0
+    mc = None
+    with Client(address, authkey=authkey) as conn:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                return shards
+            if message[0] == SIMULATION:
+                mc = message[1]
+            elif message[0] == SHARD:
+                index = message[1]
+                try:
+                    aggregate = Aggregate.of_block(mc, index)
+                except Exception as e:
+                    conn.send((ERROR, index, repr(e)))
+                    raise
+                conn.send((RESULT, index, aggregate))
+                shards += 1
+            else:
+                return shards
@@ -0,0 +1,227 @@
+"""
+Step a whole cohort of runs through the years at once.
+
+Where ``Run`` walks one household through chained ``Year`` objects, a ``Cohort``
+keeps the balances of many runs in lists and asks its ``Policy`` for every
+decision of a year in one call.  Runs that are finished, because the household
+died or ran out of money, are compacted out of the lists so they cost nothing
+for the remaining years.
+"""
+
+from .accounts import (
+    CASH_RATE,
+    Accounts,
+    IRAAccount,
+    RothAccount,
+    TaxableAccount,
+    holdings_income,
+    required_distribution,
+)
+from .policy import CohortState, Policy
+from .year import account_growths, estimate_taxes
+
+
+class CohortRun:
+    """The outcome of one run of a cohort, with the same success measures as Run."""
+
+    def __init__(self, age, max_age, death_age=None, full_horizon=True) -> None:
+        self.age = age
+        self.max_age = max_age
+        self.death_age = death_age
+        self.full_horizon = full_horizon
+        self.ending = None
+        self.last_age = None
+        self.depleted_age = None
+        self.total_taxes = 0
+        self.minimum_net_worth = None
+        self.shortfall = 0
+
+    @property
+    def horizon(self):
+        if self.death_age is None or self.full_horizon:
+            return self.max_age
+        return min(self.death_age, self.max_age)
+
+    @property
+    def lifetime_end(self):
+        if self.death_age is None:
+            return self.max_age
+        return min(self.death_age, self.max_age)
+
+    @property
+    def is_success(self):
+        if not self.ending:
+            return None
+        if self.depleted_age is not None:
+            return False
+        if self.last_age < self.max_age:
+            return None
+        return self.ending.net_worth > 0
+
+    @property
+    def is_success_to_death(self):
+        if self.death_age is None:
+            return self.is_success
+        if not self.ending:
+            return None
+        return self.depleted_age is None or self.depleted_age > self.death_age
+
+
+class Cohort:
+    """
+    Args:
+        policy: Makes every decision for the cohort.
+        ages: Starting age of each run.
+        balances: Starting (taxable, ira, roth) of each run.
+        paths: (stock growth, bond growth, inflation) per year for each run.
+        max_age: The last age any run is simulated to.
+        death_ages: Optional death age of each run.
+        full_horizon: Keep stepping past the death age up to ``max_age``.
+    """
+
+    def __init__(
+        self,
+        policy: Policy,
+        ages,
+        balances,
+        paths,
+        max_age,
+        death_ages=None,
+        full_horizon=True,
+    ) -> None:
+        self.policy = policy
+        self.ages = list(ages)
+        self.balances = list(balances)
+        self.paths = paths
+        if death_ages is None:
+            death_ages = [None] * len(self.ages)
+        self.runs = [
+            CohortRun(age, max_age, death_age, full_horizon)
+            for age, death_age in zip(self.ages, death_ages)
+        ]
+        for run, balances in zip(self.runs, self.balances):
+            run.minimum_net_worth = sum(balances)
+
+    def process(self):
+        """Step every run to its horizon and return the ``CohortRun``s."""
+        # Indexes of the runs still being stepped and their state, kept aligned.
+        active = list(range(len(self.runs)))
+        ages = list(self.ages)
+        taxable = [b[0] for b in self.balances]
+        ira = [b[1] for b in self.balances]
+        roth = [b[2] for b in self.balances]
+        last_returns = [None] * len(active)
+        last_expenses = [None] * len(active)
+        memory = [None] * len(active)
+
+        while active:
+            state = CohortState(
+                ages, taxable, ira, roth, last_returns, last_expenses, memory
+            )
+            expenses = self.policy.expenses(state)
+            allocations = self.policy.allocations(state)
+            sources = self.policy.income_sources(state, expenses)
+            conversions = self.policy.conversions(state)
+
+            keep = []
+            for i, run_index in enumerate(active):
+                run = self.runs[run_index]
+                returns = self.paths[run_index][ages[i] - run.age]
+                taxable[i], ira[i], roth[i], taxes = self.step(
+                    ages[i],
+                    taxable[i],
+                    ira[i],
+                    roth[i],
+                    returns,
+                    expenses[i],
+                    allocations[i],
+                    sources[i],
+                    conversions[i],
+                )
+                last_returns[i] = returns
+                last_expenses[i] = expenses[i]
+                run.total_taxes += taxes
+                net_worth = taxable[i] + ira[i] + roth[i]
+                run.minimum_net_worth = min(run.minimum_net_worth, net_worth)
+
+                if net_worth <= 0:
+                    run.depleted_age = ages[i]
+                    run.shortfall = self.unfunded_spending(run, net_worth, expenses[i])
+                elif ages[i] < run.horizon:
+                    ages[i] += 1
+                    keep.append(i)
+                    continue
+                run.last_age = ages[i]
+                run.ending = Accounts(
+                    TaxableAccount(taxable[i]), IRAAccount(ira[i]), RothAccount(roth[i])
+                )
+
+            if len(keep) != len(active):
+                active = [active[i] for i in keep]
+                ages, taxable, ira, roth, last_returns, last_expenses, memory = (
+                    [values[i] for i in keep]
+                    for values in (
+                        ages,
+                        taxable,
+                        ira,
+                        roth,
+                        last_returns,
+                        last_expenses,
+                        memory,
+                    )
+                )
+        return self.runs
+
+    def unfunded_spending(self, run, net_worth, expenses):
+        """
+        What the run overdrew the year it was depleted, plus the policy's
+        expenses for the rest of the household's life.  See
+        ``Run.unfunded_spending``.
+        """
+        end = run.lifetime_end
+        if run.depleted_age > end:
+            return 0
+        return max(-net_worth, 0) + sum(
+            self.policy.unfunded_expenses(age, expenses)
+            for age in range(run.depleted_age + 1, end + 1)
+        )
+
+    @staticmethod
+    def step(
+        age, taxable, ira, roth, returns, expenses, allocations, source, conversion
+    ):
+        """
+        Apply one year to one run, the same way ``Year.process_year`` does.
+
+        Returns:
+            tuple: The ending (taxable, ira, roth) and the taxes paid.
+        """
+        stock_growth, bond_growth, inflation = returns
+        taxable_growth, ira_growth, roth_growth = account_growths(
+            allocations, (stock_growth, bond_growth, CASH_RATE)
+        )
+        forced_distribution = required_distribution(ira, age)
+        forced_capital, forced_regular = holdings_income(
+            taxable, allocations["taxable"]
+        )
+        taxes = estimate_taxes(
+            expenses,
+            source,
+            forced_capital,
+            forced_regular + forced_distribution,
+            conversion,
+        )
+        total_expenses = expenses + taxes
+
+        taxable = (
+            taxable * (1 + taxable_growth - inflation) - total_expenses * source[0]
+        )
+        ira = ira * (1 + ira_growth - inflation) - total_expenses * source[1]
+        roth = roth * (1 + roth_growth - inflation) - total_expenses * source[2]
+
+        taxable += forced_distribution
+        ira -= forced_distribution
+
+        ira -= conversion
+        roth += conversion
+        return taxable, ira, roth, taxes
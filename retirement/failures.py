@@ -0,0 +1,79 @@
+"""
+Streaming accumulators of when and by how much runs fail.
+
+A MonteCarlo adds every run as it finishes, so the report can show the ages
+households run out of money and how much spending went unfunded without keeping
+or replaying the runs.  The accumulators merge exactly, like ``QuantileSketch``,
+so shards simulated elsewhere can be combined.
+"""
+
+from .sketch import QuantileSketch
+
+# Years per bar of the failure age histogram.
+HISTOGRAM_BUCKET = 5
+
+
+class FailureDistribution:
+    """
+    Attributes:
+        runs: Number of runs added.
+        failure_ages: Age the money ran out -> number of failed runs.
+        shortfalls: Sketch of the unfunded spending of the failed runs.
+        minimum_net_worths: Sketch of the lowest real net worth of every run.
+    """
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self.failure_ages = {}
+        self.shortfalls = QuantileSketch()
+        self.minimum_net_worths = QuantileSketch()
+
+    @property
+    def failures(self):
+        return sum(self.failure_ages.values())
+
+    def add(self, run, failed):
+        """Add a processed run, ``failed`` by the simulation's primary measure."""
+        self.runs += 1
+        self.minimum_net_worths.add(run.minimum_net_worth)
+        if failed:
+            age = run.depleted_age
+            self.failure_ages[age] = self.failure_ages.get(age, 0) + 1
+            self.shortfalls.add(run.shortfall)
+
+    def merge(self, other: "FailureDistribution"):
+        self.runs += other.runs
+        for age, count in other.failure_ages.items():
+            self.failure_ages[age] = self.failure_ages.get(age, 0) + count
+        self.shortfalls.merge(other.shortfalls)
+        self.minimum_net_worths.merge(other.minimum_net_worths)
+
+    def histogram(self, bucket=HISTOGRAM_BUCKET):
+        """
+        Returns:
+            list: (first age, last age, failures) of every ``bucket`` years with
+            failures, youngest first.
+        """
+        counts = {}
+        for age, count in self.failure_ages.items():
+            start = age - age % bucket
+            counts[start] = counts.get(start, 0) + count
+        return [(start, start + bucket - 1, counts[start]) for start in sorted(counts)]
+
+    def report(self):
+        if not self.runs:
+            return
+        if self.failure_ages:
+            print("Failure ages:")
+            for first, last, count in self.histogram():
+                print(f"  {first}-{last}: {count} [{count / self.runs * 100:.2f}%]")
+            print(
+                f"Unfunded spending of failed runs: "
+                f"median ~${self.shortfalls.quantile(50):,.0f}, "
+                f"90% ~${self.shortfalls.quantile(90):,.0f}"
+            )
+        minimums = self.minimum_net_worths
+        print(
+            f"Lowest real net worth: 10% ~${minimums.quantile(10):,.0f}, "
+            f"median ~${minimums.quantile(50):,.0f}"
+        )
@@ -0,0 +1,78 @@
+"""
+Stochastic lifespans from a period life table.
+
+``mortality.json`` holds the probability of dying within the year at each age
+(q(x)), approximated from the SSA period life table.  Ages outside the table
+use the nearest age in it.
+"""
+
+import functools
+import json
+from pathlib import Path
+
+MALE = "male"
+FEMALE = "female"
+
+MORTALITY_FILE = Path(__file__).parent / "mortality.json"
+
+
+@functools.lru_cache(maxsize=None)
+def mortality_table():
+    """Return sex -> age -> q(x), loaded on first use."""
+    return {
+        sex: {int(age): q for age, q in table.items()}
+        for sex, table in json.loads(MORTALITY_FILE.read_text()).items()
+    }
+
+
+def __getattr__(name):
+    # The table used to be loaded into MORTALITY at import.
+    if name == "MORTALITY":
+        return mortality_table()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def death_probability(sex: str, age: int) -> float:
+    """Probability that someone of ``sex`` and ``age`` dies within the year."""
+    table = mortality_table()[sex]
+    return table[min(max(age, min(table)), max(table))]
+
+
+def sample_death_age(sex: str, age: int, rng) -> int:
+    """Sample the age at which someone currently ``age`` dies."""
+    while rng.random() >= death_probability(sex, age):
+        age += 1
+    return age
+
+
+class Lifespan:
+    """
+    The members of a household, used to sample when the household ends.
+
+    A single member gives a single life, several members a joint life that ends
+    with the last survivor.
+
+    Args:
+        sexes: Sex of each member.
+        age_offsets: Age of each member relative to the household age, all zero
+            when not given.
+
+    Raises:
+        ValueError: on an unknown sex or mismatched offsets.
+    """
+
+    def __init__(self, sexes=(MALE,), age_offsets=None) -> None:
+        if age_offsets is None:
+            age_offsets = [0] * len(sexes)
+        unknown = set(sexes) - set(mortality_table())
+        if unknown or not sexes or len(age_offsets) != len(sexes):
+            raise ValueError(f"invalid household {sexes=} {age_offsets=}")
+        self.sexes = tuple(sexes)
+        self.age_offsets = tuple(age_offsets)
+
+    def sample(self, age: int, rng) -> int:
+        """Return the household age during which the last member dies."""
+        return max(
+            sample_death_age(sex, age + offset, rng) - offset
+            for sex, offset in zip(self.sexes, self.age_offsets)
+        )
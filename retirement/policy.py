@@ -0,0 +1,196 @@
+"""
+Spending and withdrawal policies that decide for a whole cohort of runs at once.
+
+A policy is handed a ``CohortState`` holding one entry per active run in each of
+its lists, and every method returns a list with one decision per run.  The
+cohort engine calls the methods once a year for all the runs it is stepping,
+instead of once per run like ``Plan``.
+"""
+
+from .accounts import CASH_RATE, Accounts, IRAAccount, RothAccount, TaxableAccount
+from .year import Plan
+
+
+def portfolio_return(portfolio, returns):
+    """Real return of ``portfolio`` given (stock growth, bond growth, inflation)."""
+    stock_growth, bond_growth, inflation = returns
+    return (
+        stock_growth * portfolio["stocks"]
+        + bond_growth * portfolio["bonds"]
+        + CASH_RATE * portfolio.get("cash", 0)
+        - inflation
+    )
+
+
+class CohortState:
+    """
+    The active runs of a cohort at the start of a year.
+
+    Attributes:
+        ages: Age of each run.
+        taxable, ira, roth: Starting balance of each account.
+        last_returns: Last year's (stock growth, bond growth, inflation), None in
+            the first year.
+        last_expenses: Last year's pre-tax expenses, None in the first year.
+        memory: A slot per run the policy is free to use to carry its own values
+            from one year to the next.
+    """
+
+    def __init__(
+        self, ages, taxable, ira, roth, last_returns, last_expenses, memory
+    ) -> None:
+        self.ages = ages
+        self.taxable = taxable
+        self.ira = ira
+        self.roth = roth
+        self.last_returns = last_returns
+        self.last_expenses = last_expenses
+        self.memory = memory
+
+    def __len__(self):
+        return len(self.ages)
+
+    @property
+    def net_worths(self):
+        return [t + i + r for t, i, r in zip(self.taxable, self.ira, self.roth)]
+
+
+class Policy:
+    """The interface the cohort engine expects from a policy."""
+
+    def expenses(self, state: CohortState) -> list:
+        """Pre-tax expenses of each run."""
+        raise NotImplementedError
+
+    def allocations(self, state: CohortState) -> list:
+        """
+        Allocations of each run, a dict of account name -> portfolio of
+        stocks/bonds/cash fractions.
+        """
+        raise NotImplementedError
+
+    def income_sources(self, state: CohortState, expenses) -> list:
+        """(taxable, ira, roth) fractions ``expenses`` are withdrawn from per run."""
+        raise NotImplementedError
+
+    def conversions(self, state: CohortState) -> list:
+        """Amount converted from the IRA to the roth for each run."""
+        raise NotImplementedError
+
+    def unfunded_expenses(self, age, last_expenses):
+        """
+        Pre-tax expenses a run that ran out of money would have had at ``age``,
+        given its expenses the year it did.
+        """
+        return last_expenses
+
+    def settings(self):
+        """Plain values identifying the policy, used to match checkpoints."""
+        return {"class": type(self).__name__}
+
+
+class PlanPolicy(Policy):
+    """
+    ``Plan``'s decisions for a whole cohort, asking ``plan`` so a ``Plan``
+    subclass decides the same way here as it does in a ``Run``.
+
+    The decisions that only depend on age are asked once per distinct age in the
+    cohort rather than once per run.
+    """
+
+    def __init__(self, plan: Plan = None) -> None:
+        self.plan = plan or Plan()
+
+    def by_age(self, decide, ages):
+        """``decide(age)`` for each of ``ages``, called once per distinct age."""
+        decisions = {age: decide(age) for age in set(ages)}
+        return [decisions[age] for age in ages]
+
+    def expenses(self, state):
+        return self.by_age(self.plan.pre_tax_expenses, state.ages)
+
+    def allocations(self, state):
+        return self.by_age(self.plan.allocations, state.ages)
+
+    def income_sources(self, state, expenses):
+        balances = zip(state.ages, state.taxable, state.ira, state.roth)
+        if type(self.plan).income_source is not Plan.income_source:
+            # Only an overridden income_source needs the accounts built.
+            return [
+                self.plan.income_source(
+                    age,
+                    Accounts(
+                        TaxableAccount(taxable), IRAAccount(ira), RothAccount(roth)
+                    ),
+                )
+                for age, taxable, ira, roth in balances
+            ]
+        return [self.plan.withdrawal_source(*values) for values in balances]
+
+    def conversions(self, state):
+        return self.by_age(self.plan.roth_conversion, state.ages)
+
+    def unfunded_expenses(self, age, last_expenses):
+        return self.plan.pre_tax_expenses(age)
+
+    def settings(self):
+        settings = super().settings()
+        settings.update(vars(self.plan))
+        return settings
+
+
+class GuardrailPolicy(PlanPolicy):
+    """
+    Guyton-Klinger style guardrails on top of ``PlanPolicy``.
+
+    Each run's spending is the plan's expenses times a multiplier.  When the
+    withdrawal rate rises above ``upper_rate`` the multiplier is cut by
+    ``adjustment``.  When it falls below ``lower_rate`` it is raised by
+    ``adjustment``, unless last year's return of the plan's overall portfolio was
+    negative.  The first year is spent as planned, and spending is never cut below
+    the plan's expenses without the wants.
+    """
+
+    def __init__(
+        self, plan: Plan = None, lower_rate=0.04, upper_rate=0.06, adjustment=0.1
+    ) -> None:
+        super().__init__(plan)
+        self.lower_rate = lower_rate
+        self.upper_rate = upper_rate
+        self.adjustment = adjustment
+
+    def expenses(self, state):
+        expenses = []
+        for i, (expense, net_worth, last_returns, portfolio) in enumerate(
+            zip(
+                super().expenses(state),
+                state.net_worths,
+                state.last_returns,
+                [self.plan.portfolio(age) for age in state.ages],
+            )
+        ):
+            multiplier = state.memory[i]
+            if multiplier is None:
+                multiplier = 1
+            elif net_worth <= 0 or expense * multiplier / net_worth > self.upper_rate:
+                multiplier *= 1 - self.adjustment
+            elif expense * multiplier / net_worth < self.lower_rate and not (
+                last_returns and portfolio_return(portfolio, last_returns) < 0
+            ):
+                multiplier *= 1 + self.adjustment
+            state.memory[i] = multiplier
+            expenses.append(
+                max(expense * multiplier, expense - self.plan.want_expenses, 0)
+            )
+        return expenses
+
+    def settings(self):
+        settings = super().settings()
+        settings.update(
+            {
+                "lower_rate": self.lower_rate,
+                "upper_rate": self.upper_rate,
+                "adjustment": self.adjustment,
+            }
+        )
+        return settings
@@ -0,0 +1,185 @@
+"""
+Compact per-run results of a MonteCarlo.
+
+Rather than keeping every ``Run`` with its chain of ``Year`` objects, a
+simulation keeps one row per run in columns of preallocated ``array``s, under
+70 bytes a run.  A row holds what the reports need: the ending balance of each
+account, the age the run failed at, the death age, the total taxes paid, the
+unfunded spending, the lowest real net worth and the index of the run's
+scenario.
+"""
+
+from array import array
+
+from .accounts import ACCOUNTS, Accounts, IRAAccount, RothAccount, TaxableAccount
+
+# Stored in the age columns when there is no age.
+NO_AGE = -1
+
+# column name -> array type code
+COLUMNS = {
+    "taxable": "d",
+    "ira": "d",
+    "roth": "d",
+    "failure_age": "h",
+    "death_age": "h",
+    "taxes": "d",
+    "shortfall": "d",
+    "minimum_net_worth": "d",
+    "scenario": "q",
+}
+
+
+def select(values, k):
+    """
+    Find the ``k``-th smallest of ``values``, counting from 0, by quickselect in
+    expected linear time.
+
+    Returns:
+        tuple: The value and how many of ``values`` are smaller than it.
+    """
+    smaller = 0
+    while True:
+        pivot = values[len(values) // 2]
+        lower = [v for v in values if v < pivot]
+        if k < len(lower):
+            values = lower
+            continue
+        equal = values.count(pivot)
+        if k < len(lower) + equal:
+            return pivot, smaller + len(lower)
+        smaller += len(lower) + equal
+        k -= len(lower) + equal
+        values = [v for v in values if v > pivot]
+
+
+class RunRecord:
+    """
+    One row of ``RunRecords``, with the attributes of a processed run the
+    reports use.
+    """
+
+    def __init__(
+        self,
+        taxable,
+        ira,
+        roth,
+        failure_age,
+        death_age,
+        taxes,
+        shortfall,
+        minimum_net_worth,
+        scenario,
+    ) -> None:
+        self.ending = Accounts(
+            TaxableAccount(taxable), IRAAccount(ira), RothAccount(roth)
+        )
+        self.depleted_age = None if failure_age == NO_AGE else failure_age
+        self.death_age = None if death_age == NO_AGE else death_age
+        self.total_taxes = taxes
+        self.shortfall = shortfall
+        self.minimum_net_worth = minimum_net_worth
+        self.scenario = scenario
+
+
+class RunRecords:
+    """
+    The results of up to ``capacity`` runs, stored column-wise.
+
+    The columns are allocated on the first ``append``, and only the rows in use
+    are pickled, so a simulation that hasn't started yet is cheap to send to a
+    worker.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.columns = None
+        self.size = 0
+        # Ending net worth of every row, built on the first percentile lookup.
+        self.net_worths = None
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return (self.row(index) for index in range(self.size))
+
+    def __getstate__(self):
+        state = dict(vars(self))
+        if self.columns is not None:
+            state["columns"] = {
+                name: column[: self.size] for name, column in self.columns.items()
+            }
+        return state
+
+    def __setstate__(self, state):
+        vars(self).update(state)
+        if self.columns is not None:
+            for column in self.columns.values():
+                column.extend(array(column.typecode, [0]) * (self.capacity - self.size))
+
+    def allocate(self):
+        self.columns = {
+            name: array(code, [0]) * self.capacity for name, code in COLUMNS.items()
+        }
+
+    def clear(self):
+        self.size = 0
+        self.net_worths = None
+
+    def append(self, run, scenario):
+        """
+        Record a processed run, either a ``Run`` or a ``CohortRun``.
+
+        Raises:
+            IndexError: if all ``capacity`` rows are taken.
+        """
+        if self.size == self.capacity:
+            raise IndexError(f"no room for more than {self.capacity} runs")
+        if self.columns is None:
+            self.allocate()
+        values = {
+            "failure_age": NO_AGE if run.depleted_age is None else run.depleted_age,
+            "death_age": NO_AGE if run.death_age is None else run.death_age,
+            "taxes": run.total_taxes,
+            "shortfall": run.shortfall,
+            "minimum_net_worth": run.minimum_net_worth,
+            "scenario": scenario,
+        }
+        values.update(run.ending.balances)
+        for name, value in values.items():
+            self.columns[name][self.size] = value
+        self.size += 1
+        self.net_worths = None
+
+    def row(self, index) -> RunRecord:
+        return RunRecord(*(self.columns[name][index] for name in COLUMNS))
+
+    def net_worth(self, index):
+        """The ending net worth of a row, the same as ``Accounts.net_worth``."""
+        columns = self.columns
+        return int(
+            columns["taxable"][index] + columns["ira"][index] + columns["roth"][index]
+        )
+
+    def percentile(self, percentile) -> RunRecord:
+        """
+        The row at ``percentile`` of the ending net worths, ties in run order.
+
+        The row is found by selection rather than by sorting every row.
+        """
+        if not self.size:
+            return None
+        net_worths = self.net_worths
+        if net_worths is None:
+            columns = [self.columns[name][: self.size] for name in ACCOUNTS]
+            net_worths = self.net_worths = array(
+                "q", [int(t + i + r) for t, i, r in zip(*columns)]
+            )
+        rank = int(percentile * self.size / 100)
+        value, smaller = select(net_worths, rank)
+        # Ties are in run order.
+        index = net_worths.index(value)
+        for _ in range(rank - smaller):
+            index = net_worths.index(value, index + 1)
+        return self.row(index)
@@ -0,0 +1,138 @@
+"""
+Sampling schemes for the Monte Carlo draws.
+
+A sampler produces a block of points in the unit hypercube, one point per run
+and one coordinate per random draw the run makes.  The simulation maps each
+coordinate through the empirical distribution of the matching data set, so
+a plain sampler is equivalent to ``random.choice``.
+
+All randomness comes from the ``random.Random`` passed to ``uniforms`` so a
+block can be reproduced from its seed.
+"""
+
+PLAIN = "plain"
+ANTITHETIC = "antithetic"
+STRATIFIED = "stratified"
+HALTON = "halton"
+
+
+class Sampler:
+    """Independent uniform draws."""
+
+    def __init__(self, dimensions: int) -> None:
+        self.dimensions = dimensions
+
+    def uniforms(self, count, rng):
+        """Return ``count`` points, each a list of ``dimensions`` floats in [0, 1]."""
+        return [[rng.random() for _ in range(self.dimensions)] for _ in range(count)]
+
+
+class AntitheticSampler(Sampler):
+    """
+    Independent draws paired with their reflection ``1 - u``.
+
+    Points come in adjacent pairs.  An odd count gets a final unpaired draw.
+    """
+
+    def uniforms(self, count, rng):
+        points = []
+        for point in super().uniforms((count + 1) // 2, rng):
+            points.append(point)
+            points.append([1 - u for u in point])
+        return points[:count]
+
+
+class StratifiedSampler(Sampler):
+    """
+    Latin hypercube draws.
+
+    Each coordinate is split into ``count`` equal strata and every stratum is
+    hit exactly once, with the strata shuffled independently per coordinate.
+    """
+
+    def uniforms(self, count, rng):
+        columns = []
+        for _ in range(self.dimensions):
+            strata = list(range(count))
+            rng.shuffle(strata)
+            columns.append([(s + rng.random()) / count for s in strata])
+        return [list(point) for point in zip(*columns)]
+
+
+class HaltonSampler(Sampler):
+    """
+    Scrambled Halton sequence.
+
+    Each coordinate uses the radical inverse in its own prime base with a
+    random permutation of the non-zero digits, followed by a random shift
+    modulo one so that every point is uniformly distributed.
+    """
+
+    def uniforms(self, count, rng):
+        bases = primes(self.dimensions)
+        permutations = []
+        for base in bases:
+            digits = list(range(1, base))
+            rng.shuffle(digits)
+            permutations.append([0] + digits)
+        shifts = [rng.random() for _ in bases]
+
+        points = []
+        for index in range(1, count + 1):
+            point = []
+            for base, permutation, shift in zip(bases, permutations, shifts):
+                u = radical_inverse(index, base, permutation) + shift
+                point.append(u - 1 if u >= 1 else u)
+            points.append(point)
+        return points
+
+
+SAMPLERS = {
+    PLAIN: Sampler,
+    ANTITHETIC: AntitheticSampler,
+    STRATIFIED: StratifiedSampler,
+    HALTON: HaltonSampler,
+}
+
+
+def get_sampler(name: str, dimensions: int) -> Sampler:
+    """
+    Raises:
+        ValueError: if ``name`` isn't one of ``SAMPLERS``.
+    """
+    if name not in SAMPLERS:
+        raise ValueError(
+            f"unknown sampling scheme {name!r}, use one of {sorted(SAMPLERS)}"
+        )
+    return SAMPLERS[name](dimensions)
+
+
+def primes(count: int) -> list[int]:
+    """Return the first ``count`` prime numbers."""
+    found = []
+    candidate = 2
+    while len(found) < count:
+        if all(candidate % p for p in found if p * p <= candidate):
+            found.append(candidate)
+        candidate += 1
+    return found
+
+
+def radical_inverse(index: int, base: int, permutation=None) -> float:
+    """
+    Mirror the digits of ``index`` in ``base`` around the radix point.
+
+    Args:
+        index: The position in the sequence.
+        base: The base to expand ``index`` in.
+        permutation: Optional mapping applied to every digit.
+    """
+    result = 0.0
+    scale = 1.0 / base
+    while index:
+        index, digit = divmod(index, base)
+        if permutation:
+            digit = permutation[digit]
+        result += digit * scale
+        scale /= base
+    return result
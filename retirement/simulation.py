@@ -1,31 +1,208 @@
+import functools
 import json
+import logging
+import os
+import pickle
 import random
+import time
 from pathlib import Path
 
-from .year import Year
+from .engine import Cohort
+from .failures import FailureDistribution
+from .mortality import Lifespan
+from .policy import Policy
+from .records import RunRecords
+from .sampling import PLAIN, get_sampler
+from .year import Plan, Year
+
+logger = logging.getLogger(__name__)
 
 MAX_AGE = 97
 RUNS_PER_SIMULATION = 1500
+BLOCK_SIZE = 50
+# Seconds between checkpoints.
+CHECKPOINT_INTERVAL = 30
+# 95% confidence
+CONFIDENCE_Z = 1.96
+# stock growth, bond growth, inflation
+DRAWS_PER_YEAR = 3
+
+DATA_DIR = Path(__file__).parent
+INFLATION_FILE = "inflation_list.json"
+STOCK_GROWTH_FILE = "stock_returns.json"
+BOND_GROWTH_FILE = "bond_returns.json"
+
+
+@functools.lru_cache(maxsize=None)
+def load_data(filename):
+    """Return the yearly values, in percent, of one of the data sets."""
+    return json.loads((DATA_DIR / filename).read_text())
+
+
+@functools.lru_cache(maxsize=None)
+def sorted_data(filename):
+    return sorted(load_data(filename))
+
+
+# The data sets used to be loaded into these attributes at import, now they are
+# loaded on first access.
+LAZY_ATTRIBUTES = {
+    "ALL_INFLATION": (load_data, INFLATION_FILE),
+    "ALL_STOCK_GROWTH": (load_data, STOCK_GROWTH_FILE),
+    "ALL_BOND_GROWTH": (load_data, BOND_GROWTH_FILE),
+    "SORTED_INFLATION": (sorted_data, INFLATION_FILE),
+    "SORTED_STOCK_GROWTH": (sorted_data, STOCK_GROWTH_FILE),
+    "SORTED_BOND_GROWTH": (sorted_data, BOND_GROWTH_FILE),
+}
+
+
+def __getattr__(name):
+    if name in LAZY_ATTRIBUTES:
+        loader, filename = LAZY_ATTRIBUTES[name]
+        return loader(filename)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def years_to_simulate(age):
+    """Number of years a run starting at ``age`` processes."""
+    return max(MAX_AGE - age, 0) + 1
+
 
-ALL_INFLATION = json.loads((Path.cwd() / "retirement/inflation_list.json").read_text())
-ALL_STOCK_GROWTH = json.loads(
-    (Path.cwd() / "retirement/stock_returns.json").read_text()
-)
-ALL_BOND_GROWTH = json.loads((Path.cwd() / "retirement/bond_returns.json").read_text())
+def empirical_quantile(sorted_values, u):
+    """Map ``u`` in [0, 1] onto the empirical distribution of ``sorted_values``."""
+    return sorted_values[min(int(u * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def returns_path(point):
+    """
+    Turn a sampler point into the (stock growth, bond growth, inflation) for each
+    year of a run.
+    """
+    stock_growth = sorted_data(STOCK_GROWTH_FILE)
+    bond_growth = sorted_data(BOND_GROWTH_FILE)
+    inflation = sorted_data(INFLATION_FILE)
+    path = []
+    for i in range(0, len(point), DRAWS_PER_YEAR):
+        path.append(
+            (
+                empirical_quantile(stock_growth, point[i]) / 100,
+                empirical_quantile(bond_growth, point[i + 1]) / 100,
+                empirical_quantile(inflation, point[i + 2]) / 100,
+            )
+        )
+    return path
+
+
+def class_name(obj):
+    """The qualified name of the class of ``obj``, including its module."""
+    return f"{type(obj).__module__}.{type(obj).__qualname__}"
+
+
+def replicate_variance(replicate_results):
+    """
+    Variance of the failure rate from the spread between the (failures, runs) of
+    independent blocks, None with fewer than two blocks.
+    """
+    if len(replicate_results) < 2:
+        return None
+    rates = [f / n for f, n in replicate_results]
+    mean = sum(rates) / len(rates)
+    return sum((r - mean) ** 2 for r in rates) / (len(rates) * (len(rates) - 1))
 
 
 class Run:
     def __init__(
-        self, age: int, taxable_value: float, ira_value: float, roth_value: float
+        self,
+        age: int,
+        taxable_value: float,
+        ira_value: float,
+        roth_value: float,
+        plan: Plan = None,
+        returns=None,
+        death_age: int = None,
+        full_horizon: bool = True,
+        keep_states: bool = False,
     ):
-        self.first_year = Year(age, taxable_value, ira_value, roth_value)
+        """
+        Args:
+            returns: Optional list of (stock growth, bond growth, inflation) tuples,
+                one per year.  When not given each year is drawn at random.
+            death_age: Age during which the household dies, if it's modelled.
+            full_horizon: Keep stepping past ``death_age`` up to ``MAX_AGE`` so
+                both success measures are known.
+            keep_states: Record the starting balances of every year so the run
+                can be re-processed from any age.
+        """
+        self.first_year = Year(age, taxable_value, ira_value, roth_value, plan=plan)
+        self.plan = self.first_year.plan
         self.last_year = None
+        self.returns = returns
+        self.death_age = death_age
+        self.full_horizon = full_horizon
+        # Age during which the household ran out of money, if it did.
+        self.depleted_age = None
+        self.keep_states = keep_states
+        # Starting (taxable, ira, roth) balances by age
+        self.states = {}
+        # Taxes paid by age
+        self.taxes = {}
+        # Lowest real net worth at the start or end of any year.
+        self.minimum_net_worth = None
+        # Real spending that went unfunded while the household was alive.
+        self.shortfall = None
 
     @property
     def is_success(self):
-        if self.ending:
-            return self.ending.net_worth > 0
-        return None
+        """Whether money lasted until ``MAX_AGE``, None if that wasn't simulated."""
+        if not self.ending:
+            return None
+        if self.depleted_age is not None:
+            return False
+        if self.last_year.age < MAX_AGE:
+            return None
+        return self.ending.net_worth > 0
+
+    @property
+    def is_success_to_death(self):
+        """Whether money lasted as long as the household did."""
+        if self.death_age is None:
+            return self.is_success
+        if not self.ending:
+            return None
+        return self.depleted_age is None or self.depleted_age > self.death_age
+
+    @property
+    def total_taxes(self):
+        return sum(self.taxes.values())
+
+    @property
+    def horizon(self):
+        """The last age this run needs to simulate."""
+        if self.death_age is None or self.full_horizon:
+            return MAX_AGE
+        return min(self.death_age, MAX_AGE)
+
+    @property
+    def lifetime_end(self):
+        """The last age the household spends money."""
+        if self.death_age is None:
+            return MAX_AGE
+        return min(self.death_age, MAX_AGE)
+
+    def unfunded_spending(self):
+        """
+        The real spending the household couldn't fund while alive: what it
+        overdrew the year it ran out of money, plus the plan's expenses for every
+        year after.  Growth is already net of inflation, so this is in today's
+        dollars.
+        """
+        end = self.lifetime_end
+        if self.depleted_age is None or self.depleted_age > end:
+            return 0
+        return max(-sum(self.ending.balances.values()), 0) + sum(
+            self.plan.pre_tax_expenses(age)
+            for age in range(self.depleted_age + 1, end + 1)
+        )
 
     @property
     def starting(self):
@@ -37,80 +214,551 @@ class Run:
             return self.last_year.ending
         return None
 
-    def process(self):
+    def process(self, from_age=None):
+        """
+        Step through the years until the horizon.  A run stops early once the
+        household is depleted, since it can't recover from there.
+
+        Args:
+            from_age: Only re-process from this age on, starting from the
+                balances and returns recorded by an earlier ``process``.  The
+                years before it are reused as is.
+
+        Raises:
+            ValueError: if there is no recorded state for ``from_age``.
+        """
+        returns = iter(self.returns) if self.returns is not None else None
         curr_year = self.first_year
-        while curr_year.age < MAX_AGE:
-            curr_year.process_year(
-                self.get_stock_growth(), self.get_bond_growth(), self.get_inflation()
+        curr_year.plan = self.plan
+        if from_age is not None and from_age > curr_year.age:
+            if self.returns is None or from_age not in self.states:
+                raise ValueError(f"no recorded state to re-process from {from_age}")
+            returns = iter(self.returns[from_age - curr_year.age :])
+            curr_year = Year(from_age, *self.states[from_age], plan=self.plan)
+        self.states = {age: s for age, s in self.states.items() if age < curr_year.age}
+        self.taxes = {age: t for age, t in self.taxes.items() if age < curr_year.age}
+        self.depleted_age = None
+        # The recorded states cover the years before from_age.
+        self.minimum_net_worth = min(
+            [sum(state) for state in self.states.values()]
+            + [sum(curr_year.starting.balances.values())]
+        )
+
+        while True:
+            if self.keep_states:
+                self.states[curr_year.age] = tuple(curr_year.starting.balances.values())
+            curr_year.process_year(*self.next_returns(returns))
+            self.taxes[curr_year.age] = curr_year.taxes_paid
+            self.minimum_net_worth = min(
+                self.minimum_net_worth, sum(curr_year.ending.balances.values())
             )
+            self.last_year = curr_year
+            if curr_year.ending.is_depleted:
+                self.depleted_age = curr_year.age
+                break
+            if curr_year.age >= self.horizon:
+                break
             curr_year = curr_year.get_next_year()
             # if curr_year.ending:
             # print(f"{curr_year.age} - ${curr_year.ending.net_worth:,}")
-            self.last_year = curr_year
-        self.last_year.process_year(
-            self.get_stock_growth(), self.get_bond_growth(), self.get_inflation()
-        )
 
-        print(f"{self.last_year.ending.net_worth=:,}")
+        self.shortfall = self.unfunded_spending()
+        logger.debug(f"{self.last_year.ending.net_worth=:,}")
+
+    def next_returns(self, returns=None):
+        if returns is not None:
+            return next(returns)
+        return self.get_stock_growth(), self.get_bond_growth(), self.get_inflation()
 
     def get_stock_growth(self):
-        return random.choice(ALL_STOCK_GROWTH) / 100
+        return random.choice(load_data(STOCK_GROWTH_FILE)) / 100
 
     def get_bond_growth(self):
-        return random.choice(ALL_BOND_GROWTH) / 100
+        return random.choice(load_data(BOND_GROWTH_FILE)) / 100
 
     def get_inflation(self):
-        return random.choice(ALL_INFLATION) / 100
+        return random.choice(load_data(INFLATION_FILE)) / 100
 
 
 class MonteCarlo:
-    def __init__(self, age, taxable, ira, roth) -> None:
+    def __init__(
+        self,
+        age,
+        taxable,
+        ira,
+        roth,
+        plan=None,
+        runs=RUNS_PER_SIMULATION,
+        sampling=PLAIN,
+        block_size=BLOCK_SIZE,
+        seed=None,
+        lifespan: Lifespan = None,
+        full_horizon=True,
+        keep_states=False,
+        policy: Policy = None,
+    ) -> None:
+        """
+        Args:
+            sampling: Name of the sampling scheme, one of ``sampling.SAMPLERS``.
+            block_size: The runs are done in independently seeded blocks of this
+                size.  The spread between blocks measures the variance of the
+                failure rate for any sampling scheme, and progress is
+                checkpointed between blocks.
+            seed: Seed for the blocks, random when not given.
+            lifespan: Sample a death age per run from this household.
+            full_horizon: With a lifespan, keep simulating to ``MAX_AGE`` after
+                death so success to ``MAX_AGE`` is reported as well.
+            keep_states: Keep every ``Run`` with its yearly balances so ``rerun``
+                can re-evaluate a changed plan from the first age it changes.
+                Otherwise only the compact ``records`` of the runs are kept.
+            policy: Step each block as a cohort with this policy instead of
+                running every run through ``plan``.
+
+        Raises:
+            ValueError: if a policy is combined with a plan or keep_states.
+        """
+        if policy and (plan or keep_states):
+            raise ValueError("a policy can't be combined with a plan or keep_states")
         self.starting_age = age
         self.starting_taxable = taxable
         self.starting_ira = ira
         self.starting_roth = roth
+        self.plan = plan
+        self.number_of_runs = runs
+        self.sampling = sampling
+        self.sampler = get_sampler(sampling, DRAWS_PER_YEAR * years_to_simulate(age))
+        self.block_size = block_size
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.lifespan = lifespan
+        self.full_horizon = full_horizon
+        self.keep_states = keep_states
+        self.policy = policy
 
+        # One row per finished run.
+        self.records = RunRecords(runs)
+        # The finished runs themselves, only with keep_states.
         self.runs = []
-        self.sorted_runs = []
+        # failures to MAX_AGE
         self.failures = 0
+        # failures before the household died
+        self.death_failures = 0
+        # When and by how much the runs failed, by the primary measure
+        self.failure_distribution = FailureDistribution()
+        # (failures, runs) for each complete block
+        self.replicate_results = []
+        self.completed_blocks = 0
 
         self.reset()
 
     def reset(self):
+        self.records.clear()
         self.runs = []
-        self.sorted_runs = []
         self.failures = 0
+        self.death_failures = 0
+        self.failure_distribution = FailureDistribution()
+        self.replicate_results = []
+        self.completed_blocks = 0
 
-    def start(self):
-        self.reset()
-        for _ in range(RUNS_PER_SIMULATION):
-            run = Run(
-                self.starting_age,
-                self.starting_taxable,
-                self.starting_ira,
-                self.starting_roth,
-            )
+    @property
+    def knows_full_horizon(self):
+        """Whether every run was simulated to ``MAX_AGE`` (unless depleted)."""
+        return self.lifespan is None or self.full_horizon
+
+    @property
+    def primary_failures(self):
+        """Failures to death when lifespans are modelled, else to ``MAX_AGE``."""
+        return self.death_failures if self.lifespan else self.failures
+
+    def block_sizes(self):
+        blocks, extra = divmod(self.number_of_runs, self.block_size)
+        return [self.block_size] * blocks + ([extra] if extra else [])
+
+    def start(self, checkpoint=None, time_budget=None):
+        """
+        Simulate all the runs.
+
+        Args:
+            checkpoint: Path to periodically save progress to.  If it already
+                exists the simulation resumes from where it stopped.
+            time_budget: Seconds to spend.  When it runs out the simulation stops
+                after the current run, with whatever runs finished.  The
+                checkpoint is saved first, with the blocks that finished.
+
+        Returns:
+            dict: The current ``estimate()``, None if no run finished in time.
+        """
+        if not (checkpoint and self.load_checkpoint(checkpoint)):
+            self.reset()
+        deadline = time.monotonic() + time_budget if time_budget else None
+        last_checkpoint = time.monotonic()
+
+        block_sizes = self.block_sizes()
+        for index in range(self.completed_blocks, len(block_sizes)):
+            runs = self.simulate_block(index, block_sizes[index], deadline)
+            if len(runs) < block_sizes[index]:
+                # Checkpoint the whole blocks, then let the runs that finished
+                # in time count towards the estimate.
+                if checkpoint:
+                    self.save_checkpoint(checkpoint)
+                self.add_block(index, runs, complete=False)
+                break
+            self.add_block(index, runs)
+            if checkpoint and (
+                time.monotonic() - last_checkpoint > CHECKPOINT_INTERVAL
+                or self.completed_blocks == len(block_sizes)
+            ):
+                self.save_checkpoint(checkpoint)
+                last_checkpoint = time.monotonic()
+        return self.estimate()
+
+    def process_block(self, index, size, deadline=None):
+        """
+        Simulate the runs of one block and add them.
+
+        Returns:
+            bool: False if the deadline passed before the block was finished.
+        """
+        runs = self.simulate_block(index, size, deadline)
+        self.add_block(index, runs, complete=len(runs) == size)
+        return len(runs) == size
+
+    def simulate_block(self, index, size, deadline=None):
+        """
+        Process the runs of one block, stopping early if the deadline passes.
+
+        Returns:
+            list: The processed runs, in scenario order.
+        """
+        if self.policy:
+            if deadline and time.monotonic() > deadline:
+                return []
+            return self.process_cohort(self.block_scenarios(index, size))
+        runs = []
+        for returns, death_age in self.block_scenarios(index, size):
+            if deadline and time.monotonic() > deadline:
+                break
+            run = self.new_run(returns, death_age)
             run.process()
-            if not run.is_success:
-                self.failures += 1
+            runs.append(run)
+        return runs
+
+    def add_block(self, index, runs, complete=True):
+        """
+        Count and keep the processed ``runs`` of block ``index``.  The runs of a
+        block cut short by the deadline count towards the results, but the block
+        isn't marked as completed.
+        """
+        primary_failures = self.primary_failures
+        first_scenario = index * self.block_size
+        for position, run in enumerate(runs):
+            self.count(run)
+            self.add(run, first_scenario + position)
+        if not complete:
+            return
+        self.completed_blocks += 1
+        if len(runs) == self.block_size:
+            self.replicate_results.append(
+                (self.primary_failures - primary_failures, len(runs))
+            )
+
+    def process_cohort(self, scenarios):
+        """Step the runs of ``scenarios`` together with the policy."""
+        cohort = Cohort(
+            self.policy,
+            [self.starting_age] * len(scenarios),
+            [(self.starting_taxable, self.starting_ira, self.starting_roth)]
+            * len(scenarios),
+            [returns for returns, _ in scenarios],
+            MAX_AGE,
+            [death_age for _, death_age in scenarios],
+            self.full_horizon,
+        )
+        return cohort.process()
+
+    def block_scenarios(self, index, size):
+        """Return the (returns path, death age) of every run in a block."""
+        rng = random.Random(f"{self.seed}:{index}")
+        points = self.sampler.uniforms(size, rng)
+        # Drawn after the returns so paths don't depend on the lifespan.
+        death_ages = [
+            self.lifespan.sample(self.starting_age, rng) if self.lifespan else None
+            for _ in points
+        ]
+        return [(returns_path(p), d) for p, d in zip(points, death_ages)]
+
+    def new_run(self, returns, death_age, **kwargs):
+        """
+        Create an unprocessed run of this simulation.  ``kwargs`` override the
+        simulation's starting values and options.
+        """
+        options = {
+            "age": self.starting_age,
+            "taxable_value": self.starting_taxable,
+            "ira_value": self.starting_ira,
+            "roth_value": self.starting_roth,
+            "plan": self.plan,
+            "full_horizon": self.full_horizon,
+            "keep_states": self.keep_states,
+        }
+        options.update(kwargs)
+        return Run(returns=returns, death_age=death_age, **options)
+
+    def is_failure(self, run):
+        """Whether the run failed by the primary measure."""
+        if self.lifespan:
+            return run.is_success_to_death is False
+        return run.is_success is False
+
+    def count(self, run):
+        """Add a processed run to the failure counts."""
+        if run.is_success is False:
+            self.failures += 1
+        if run.is_success_to_death is False:
+            self.death_failures += 1
+        self.failure_distribution.add(run, self.is_failure(run))
+
+    def add(self, run, scenario):
+        """Keep a processed run, ``scenario`` is its index in the simulation."""
+        self.records.append(run, scenario)
+        if self.keep_states:
             self.runs.append(run)
 
+    def recount(self):
+        """
+        Rebuild the failure counts and records from the kept runs, the same way
+        ``add_block`` built them, including the runs of a block the deadline cut
+        short.
+        """
+        runs = self.runs
+        completed_blocks = self.completed_blocks
+        self.reset()
+        start = 0
+        for index, size in enumerate(self.block_sizes()[:completed_blocks]):
+            self.add_block(index, runs[start : start + size])
+            start += size
+        if start < len(runs):
+            self.add_block(completed_blocks, runs[start:], complete=False)
+
+    def rerun(self, plan, from_age=None):
+        """
+        Re-evaluate the finished runs with a new plan over the same returns.
+
+        Each run is only re-processed from ``from_age`` on, so the cost is in
+        proportion to the years that changed.
+
+        Args:
+            plan: The new plan.
+            from_age: The first age the results can differ.  Found by comparing
+                the plans when not given.
+
+        Returns:
+            The age the runs were re-processed from, None if nothing changed.
+
+        Raises:
+            ValueError: if the simulation wasn't started with ``keep_states``.
+        """
+        if not self.keep_states:
+            raise ValueError("rerun needs a simulation started with keep_states")
+        if from_age is None:
+            from_age = (self.plan or Plan()).first_difference(
+                plan, range(self.starting_age, MAX_AGE + 1)
+            )
+        self.plan = plan
+        for run in self.runs:
+            run.plan = plan
+            if from_age is None:
+                continue
+            if from_age <= self.starting_age:
+                run.process()
+            elif from_age in run.states:
+                run.process(from_age)
+            # Otherwise the run ended before from_age and can't change.
+        self.recount()
+        return from_age
+
+    def fingerprint(self):
+        """Everything that has to match for a checkpoint to be resumed."""
+        return (
+            self.starting_age,
+            self.starting_taxable,
+            self.starting_ira,
+            self.starting_roth,
+            class_name(self.plan) if self.plan else None,
+            vars(self.plan) if self.plan else None,
+            self.number_of_runs,
+            self.sampling,
+            self.block_size,
+            self.seed,
+            vars(self.lifespan) if self.lifespan else None,
+            self.full_horizon,
+            # Only a simulation that kept its runs can rerun them.
+            self.keep_states,
+            self.policy.settings() if self.policy else None,
+        )
+
+    def save_checkpoint(self, path):
+        """
+        Atomically write the finished blocks to ``path``.
+
+        Each block is seeded from ``seed`` and its index, so the number of
+        completed blocks is the whole random state.
+        """
+        state = {
+            "fingerprint": self.fingerprint(),
+            "completed_blocks": self.completed_blocks,
+            "records": self.records,
+            "runs": self.runs,
+            "failures": self.failures,
+            "death_failures": self.death_failures,
+            "failure_distribution": self.failure_distribution,
+            "replicate_results": self.replicate_results,
+        }
+        tmp = Path(f"{path}.tmp")
+        tmp.write_bytes(pickle.dumps(state))
+        os.replace(tmp, path)
+
+    def load_checkpoint(self, path):
+        """
+        Restore the finished blocks from ``path``.
+
+        Returns:
+            bool: False if there is no checkpoint at ``path``.
+
+        Raises:
+            ValueError: if the checkpoint is for a different simulation.
+        """
+        path = Path(path)
+        if not path.exists():
+            return False
+        state = pickle.loads(path.read_bytes())
+        if state["fingerprint"] != self.fingerprint():
+            raise ValueError(f"checkpoint {path} is for a different simulation")
+        self.reset()
+        self.completed_blocks = state["completed_blocks"]
+        self.records = state["records"]
+        self.runs = state["runs"]
+        self.failures = state["failures"]
+        self.death_failures = state["death_failures"]
+        self.failure_distribution = state["failure_distribution"]
+        self.replicate_results = state["replicate_results"]
+        return True
+
+    @property
+    def is_complete(self):
+        return len(self.records) == self.number_of_runs
+
+    def estimate(self):
+        """
+        The failure rate so far with its confidence interval.
+
+        The standard error comes from the spread between complete blocks when
+        there are at least two, otherwise from plain binomial sampling.
+        """
+        variance = self.variance_report()
+        if variance is None:
+            return None
+        standard_error = (
+            variance["achieved_variance"]
+            if variance["achieved_variance"] is not None
+            else variance["plain_variance"]
+        ) ** 0.5
+        rate = variance["failure_rate"]
+        return {
+            "runs": len(self.records),
+            "complete": self.is_complete,
+            "median": self.get_nth_percentile_run(50).ending.net_worth,
+            "failure_rate": rate,
+            "standard_error": standard_error,
+            "confidence_interval": (
+                max(rate - CONFIDENCE_Z * standard_error, 0),
+                min(rate + CONFIDENCE_Z * standard_error, 1),
+            ),
+        }
+
     def get_nth_percentile_run(self, percentile):
-        if not self.runs:
+        """The ``RunRecord`` at ``percentile`` of the ending net worths."""
+        return self.records.percentile(percentile)
+
+    def summary(self):
+        """Return the headline numbers of the simulation as a dict."""
+        if not self.records:
+            return None
+        summary = {"runs": len(self.records), "failures": None, "success_rate": None}
+        if self.knows_full_horizon:
+            summary["failures"] = self.failures
+            summary["success_rate"] = 1 - self.failures / len(self.records)
+        if self.lifespan:
+            summary["death_failures"] = self.death_failures
+            summary["success_rate_to_death"] = 1 - self.death_failures / len(
+                self.records
+            )
+        summary.update(
+            {
+                "median": self.get_nth_percentile_run(50).ending.net_worth,
+                "p10": self.get_nth_percentile_run(10).ending.net_worth,
+                "p90": self.get_nth_percentile_run(90).ending.net_worth,
+            }
+        )
+        return summary
+
+    def variance_report(self):
+        """
+        Compare the variance of the failure rate against plain sampling.
+
+        The achieved variance comes from the spread of the replicate blocks, the
+        plain variance is the binomial p(1 - p) / n.  ``effective_runs`` is how
+        many plain runs would be needed for the same confidence interval.
+        """
+        if not self.records:
             return None
-        if not self.sorted_runs:
-            self.sorted_runs = sorted(self.runs, key=lambda a: a.ending.net_worth)
+        runs = len(self.records)
+        failure_rate = self.primary_failures / runs
+        plain_variance = failure_rate * (1 - failure_rate) / runs
+
+        achieved_variance = replicate_variance(self.replicate_results)
 
-        index = int(percentile * len(self.runs) / 100)
-        return self.sorted_runs[index]
+        ratio = None
+        if achieved_variance and plain_variance:
+            ratio = plain_variance / achieved_variance
+        return {
+            "sampling": self.sampling,
+            "failure_rate": failure_rate,
+            "plain_variance": plain_variance,
+            "achieved_variance": achieved_variance,
+            "variance_reduction": ratio,
+            "effective_runs": runs * ratio if ratio else None,
+        }
 
     def report(self):
         print("=======================================")
-        print(f"number of runs: {len(self.runs)}")
-        print(f"Failures: {self.failures} [{(self.failures/len(self.runs)*100):.2f}%]")
+        print(f"number of runs: {len(self.records)}")
+        if not self.records:
+            return
+        if self.knows_full_horizon:
+            print(
+                f"Failures: {self.failures} "
+                f"[{(self.failures/len(self.records)*100):.2f}%]"
+            )
+        if self.lifespan:
+            print(
+                f"Failures before death: {self.death_failures} "
+                f"[{(self.death_failures/len(self.records)*100):.2f}%]"
+            )
         tenth_percentile_run = self.get_nth_percentile_run(10)
         median_run = self.get_nth_percentile_run(50)
         ninetieth_percentile_run = self.get_nth_percentile_run(90)
         print(f"Median Net Worth: ${median_run.ending.net_worth:,}")
         print(f"10% Net Worth: ${tenth_percentile_run.ending.net_worth:,}")
         print(f"90% Net Worth: ${ninetieth_percentile_run.ending.net_worth:,}")
+        self.failure_distribution.report()
+        variance = self.variance_report()
+        if variance["achieved_variance"] is not None:
+            print(
+                f"Failure rate std err: {variance['achieved_variance'] ** 0.5:.4f} "
+                f"(plain sampling: {variance['plain_variance'] ** 0.5:.4f})"
+            )
+        if variance["variance_reduction"]:
+            print(
+                f"Variance reduction: {variance['variance_reduction']:.2f}x "
+                f"[~{variance['effective_runs']:,.0f} plain runs]"
+            )
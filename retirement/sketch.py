@@ -0,0 +1,80 @@
+"""
+A streaming quantile estimate that can be merged across processes.
+"""
+
+import math
+
+SKETCH_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    """
+    A mergeable histogram with logarithmic buckets.
+
+    A value is counted in a bucket whose estimate is within ``accuracy`` of it,
+    relative to its size, so quantiles keep that relative error however many
+    values are added.  The buckets only depend on the values, so sketches merged
+    in any order are identical.
+    """
+
+    def __init__(self, accuracy=SKETCH_ACCURACY) -> None:
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.count = 0
+        self.zeros = 0
+        # bucket key -> count, of the magnitudes of positive and negative values
+        self.positive = {}
+        self.negative = {}
+
+    def key(self, magnitude):
+        return math.ceil(math.log(magnitude, self.gamma))
+
+    def value(self, key):
+        """The estimate of every value in bucket ``key``."""
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def add(self, value):
+        self.count += 1
+        if value == 0:
+            self.zeros += 1
+            return
+        buckets = self.positive if value > 0 else self.negative
+        key = self.key(abs(value))
+        buckets[key] = buckets.get(key, 0) + 1
+
+    def merge(self, other: "QuantileSketch"):
+        """
+        Raises:
+            ValueError: if the sketches have a different accuracy.
+        """
+        if other.accuracy != self.accuracy:
+            raise ValueError("can only merge sketches with the same accuracy")
+        self.count += other.count
+        self.zeros += other.zeros
+        for buckets, other_buckets in (
+            (self.positive, other.positive),
+            (self.negative, other.negative),
+        ):
+            for key, count in other_buckets.items():
+                buckets[key] = buckets.get(key, 0) + count
+
+    def quantile(self, percentile):
+        """
+        Estimate the value at ``percentile``, ranked the same way as
+        ``MonteCarlo.get_nth_percentile_run``.
+        """
+        if not self.count:
+            return None
+        rank = int(percentile * self.count / 100)
+        for key in sorted(self.negative, reverse=True):
+            rank -= self.negative[key]
+            if rank < 0:
+                return -self.value(key)
+        rank -= self.zeros
+        if rank < 0:
+            return 0
+        for key in sorted(self.positive):
+            rank -= self.positive[key]
+            if rank < 0:
+                return self.value(key)
+        return None
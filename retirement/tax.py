@@ -169,6 +169,26 @@ class CapitalTaxTable(TaxTable):
         return (amount - (self.deduction - offset)) * 0.15
 
 
-FED_TAX_TABLE = TaxTable([FED_TAX_RAW], FED_STANDARD_DEDUCTION)
-STATE_TAX_TABLE = TaxTable([STATE_TAX_RAW, LOCAL_TAX_RAW], STATE_STANDARD_DEDUCTION)
-CAPITAL_TAX_TABLE = CapitalTaxTable([CAPITAL_TAX_RAW], CAPITAL_STANDARD_DEDUCTION)
+# The tables are built on first access, see ``__getattr__``.
+TAX_TABLES = {
+    "FED_TAX_TABLE": (TaxTable, [FED_TAX_RAW], FED_STANDARD_DEDUCTION),
+    "STATE_TAX_TABLE": (
+        TaxTable,
+        [STATE_TAX_RAW, LOCAL_TAX_RAW],
+        STATE_STANDARD_DEDUCTION,
+    ),
+    "CAPITAL_TAX_TABLE": (
+        CapitalTaxTable,
+        [CAPITAL_TAX_RAW],
+        CAPITAL_STANDARD_DEDUCTION,
+    ),
+}
+
+
+def __getattr__(name):
+    if name in TAX_TABLES:
+        table_class, tables, deduction = TAX_TABLES[name]
+        # Stored as a module global so later lookups don't come back here.
+        table = globals()[name] = table_class(tables, deduction)
+        return table
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,16 @@
-from .accounts import Accounts, IRAAccount, RothAccount, TaxableAccount
-from .tax import CAPITAL_TAX_TABLE, FED_TAX_TABLE, REGULAR_TAX, STATE_TAX_TABLE
+import logging
+
+from . import tax
+from .accounts import (
+    ACCOUNTS,
+    CASH_RATE,
+    Accounts,
+    IRAAccount,
+    RothAccount,
+    TaxableAccount,
+)
+
+logger = logging.getLogger(__name__)
 
 NEED_EXPENSES = 45000
 WANT_EXPENSES = 10000
@@ -9,44 +20,197 @@ MEDICARE_PREMIUMS = 5000
 
 MINIMUM_ACCOUNT_BALANCE_PERCENT = 0.1
 
+MEDICARE_AGE = 65
+
 SS_AMOUNT = 47500
+SS_AGE = 70
+
+# Before this age withdrawals come from the taxable account.
+EARLY_WITHDRAWAL_AGE = 60
+
+# Starting guess for taxes as a fraction of expenses, and the number of times the
+# taxes on (expenses + taxes) are recalculated from it.
+INITIAL_TAX_RATE = 0.3
+TAX_ITERATIONS = 7
+
+ASSETS = ("stocks", "bonds", "cash")
+
+
+def account_growths(allocations, asset_returns):
+    """
+    Growth of each account for the year, the (accounts x assets) weights of
+    ``allocations`` times ``asset_returns``.  Every account is rebalanced back to
+    its allocation at the start of the year.
+
+    Args:
+        allocations: Account name -> portfolio of asset fractions.
+        asset_returns: Return of each of ``ASSETS``.
+
+    Returns:
+        tuple: The (taxable, ira, roth) growth.
+    """
+    return tuple(
+        sum(
+            allocations[account].get(asset, 0) * asset_return
+            for asset, asset_return in zip(ASSETS, asset_returns)
+        )
+        for account in ACCOUNTS
+    )
+
+
+def adjust_for_forced_income(
+    capital_income, regular_income, forced_capital_income, forced_regular_income
+):
+    """
+    Adjust the taxable income values based on the amount of forced taxable income.
+
+    TODO: Doesn't consider roth as a location to adjust money too, from.
+    """
+    if (
+        capital_income < forced_capital_income
+        and regular_income < forced_regular_income
+    ):
+        capital_income = forced_capital_income
+        regular_income = forced_regular_income
+    elif capital_income < forced_capital_income:
+        diff = forced_capital_income - capital_income
+        capital_income = forced_capital_income
+        regular_income = max(regular_income - diff, 0)
+    elif regular_income < forced_regular_income:
+        diff = forced_regular_income - regular_income
+        regular_income = forced_regular_income
+        capital_income = max(capital_income - diff, 0)
+    return capital_income, regular_income
+
+
+def taxable_income(
+    expenses, source, forced_capital_income, forced_regular_income, conversion
+):
+    """
+    Return the amount of taxable income broken up in to capital income, and
+    regular income.
+
+    Args:
+        expenses: The amount that needs to be withdrawn.
+        source: (taxable, ira, roth) fractions the expenses are withdrawn from.
+        forced_capital_income: Dividends that are taxed regardless.
+        forced_regular_income: RMDs that are taxed regardless.
+        conversion: Amount converted from the IRA to the roth.
+    """
+    needed_extra_income = max(expenses, 0)
+    capital_income = needed_extra_income * source[0]
+    regular_income = needed_extra_income * source[1]
+
+    capital_income, regular_income = adjust_for_forced_income(
+        capital_income, regular_income, forced_capital_income, forced_regular_income
+    )
+
+    regular_income += conversion
+    return capital_income, regular_income
+
+
+def calculate_taxes(capital_gains, regular_income):
+    est_fed_taxes = tax.FED_TAX_TABLE.calculate_tax(regular_income)
+    est_state_taxes = tax.STATE_TAX_TABLE.calculate_tax(regular_income + capital_gains)
+    est_capital_taxes = tax.CAPITAL_TAX_TABLE.calculate_tax(
+        capital_gains, regular_income
+    )
+    # print((est_fed_taxes, est_state_taxes, est_capital_taxes))
+    taxes = est_fed_taxes + est_state_taxes + est_capital_taxes
+    return taxes
+
+
+def estimate_taxes(
+    expenses, source, forced_capital_income, forced_regular_income, conversion
+):
+    """
+    The taxes due when withdrawing ``expenses`` plus the taxes themselves.  See
+    ``taxable_income`` for the arguments.
+    """
+    taxes = expenses * INITIAL_TAX_RATE
+    for _ in range(TAX_ITERATIONS):
+        taxes = calculate_taxes(
+            *taxable_income(
+                expenses + taxes,
+                source,
+                forced_capital_income,
+                forced_regular_income,
+                conversion,
+            )
+        )
+    return taxes
 
 
 class Plan:
+    # Account name -> portfolio, for accounts that don't hold ``portfolio``.
+    asset_location = None
+
+    def __init__(
+        self,
+        need_expenses: float = NEED_EXPENSES,
+        want_expenses: float = WANT_EXPENSES,
+        aca_premiums: float = ACA_PREMIUMS,
+        medicare_premiums: float = MEDICARE_PREMIUMS,
+        ss_amount: float = SS_AMOUNT,
+        ss_age: int = SS_AGE,
+        asset_location: dict = None,
+    ) -> None:
+        self.need_expenses = need_expenses
+        self.want_expenses = want_expenses
+        self.aca_premiums = aca_premiums
+        self.medicare_premiums = medicare_premiums
+        self.ss_amount = ss_amount
+        self.ss_age = ss_age
+        self.asset_location = asset_location
+
     def portfolio(self, age):
         return {"stocks": 0.75, "bonds": 0.2, "cash": 0.05}
 
+    def allocations(self, age):
+        """
+        Returns:
+            dict: The portfolio of each account.  Accounts missing from
+            ``asset_location`` hold ``portfolio``.
+        """
+        portfolio = self.portfolio(age)
+        location = self.asset_location or {}
+        return {account: location.get(account, portfolio) for account in ACCOUNTS}
+
     def pre_tax_expenses(self, age):
         """Calculate the years expenses before tax expenses are added."""
-        base_expenses = NEED_EXPENSES + WANT_EXPENSES
-        if age < 65:
-            return base_expenses + ACA_PREMIUMS
+        base_expenses = self.need_expenses + self.want_expenses
+        if age < MEDICARE_AGE:
+            return base_expenses + self.aca_premiums
 
-        expenses = base_expenses + MEDICARE_PREMIUMS
-        if age >= 70:
-            expenses = max(expenses - SS_AMOUNT, 0)
+        expenses = base_expenses + self.medicare_premiums
+        if age >= self.ss_age:
+            expenses = max(expenses - self.ss_amount, 0)
         return expenses
 
     def income_source(self, age, starting):
         """
-
         Returns:
             tuple: Tuple of floats that should sum to 1.  Represents what percent of
             expenses comes from which account (taxable, ira, roth)
 
+        See ``withdrawal_source``, which decides from the plain balances.
+        """
+        return self.withdrawal_source(
+            age, starting.taxable.balance, starting.ira.balance, starting.roth.balance
+        )
+
+    def withdrawal_source(self, age, taxable, ira, roth):
+        """
+        ``income_source`` given the starting balance of each account.
+
         At present it's all or nothing, but that could change.
         """
-        if age < 60:
+        if age < EARLY_WITHDRAWAL_AGE:
             return (1, 0, 0)
-        if (
-            starting.ira.balance - self.pre_tax_expenses(age)
-            > starting.net_worth * MINIMUM_ACCOUNT_BALANCE_PERCENT
-        ):
+        minimum = int(taxable + ira + roth) * MINIMUM_ACCOUNT_BALANCE_PERCENT
+        if ira - self.pre_tax_expenses(age) > minimum:
             return (0, 1, 0)
-        if (
-            starting.taxable.balance - self.pre_tax_expenses(age)
-            > starting.net_worth * MINIMUM_ACCOUNT_BALANCE_PERCENT
-        ):
+        if taxable - self.pre_tax_expenses(age) > minimum:
             return (1, 0, 0)
         return (0, 0, 1)
 
@@ -55,10 +219,36 @@ class Plan:
             return 20000
         return 0
 
+    def first_difference(self, other: "Plan", ages):
+        """
+        Return the first of ``ages`` where ``other`` plans differently, None if it
+        never does.
+
+        Only the age driven decisions are compared, so a plan of a different
+        class is assumed to differ from the first age.
+        """
+        for age in ages:
+            if type(self) is not type(other) or (
+                self.pre_tax_expenses(age),
+                self.allocations(age),
+                self.roth_conversion(age),
+            ) != (
+                other.pre_tax_expenses(age),
+                other.allocations(age),
+                other.roth_conversion(age),
+            ):
+                return age
+        return None
+
 
 class Year:
     def __init__(
-        self, age: int, taxable_value: float, ira_value: float, roth_value: float
+        self,
+        age: int,
+        taxable_value: float,
+        ira_value: float,
+        roth_value: float,
+        plan: Plan = None,
     ):
         self.processed = False
         # Age on January 1st
@@ -75,80 +265,62 @@ class Year:
         self.stock_growth = None
         self.bond_growth = None
         self.inflation = None
+        # Taxes paid during the year, once processed.
+        self.taxes_paid = None
 
-        self.plan: Plan = Plan()
+        self.plan: Plan = plan or Plan()
 
     @property
-    def growth(self):
+    def asset_returns(self):
         if self.stock_growth is None or self.bond_growth is None:
             return None
+        return (self.stock_growth, self.bond_growth, CASH_RATE)
+
+    @property
+    def growth(self):
+        """Growth of the plan's overall portfolio."""
+        if self.asset_returns is None:
+            return None
         portfolio = self.plan.portfolio(self.age)
-        growth = 0
-        growth += self.stock_growth * portfolio["stocks"]
-        growth += self.bond_growth * portfolio["bonds"]
-        return growth
+        return sum(
+            portfolio.get(asset, 0) * asset_return
+            for asset, asset_return in zip(ASSETS, self.asset_returns)
+        )
+
+    @property
+    def account_growths(self):
+        """Growth of each account's own allocation, see ``account_growths``."""
+        if self.asset_returns is None:
+            return None
+        return account_growths(self.plan.allocations(self.age), self.asset_returns)
+
+    def _forced_income(self):
+        """Return the (capital, regular) income the accounts force this year."""
+        forced_capital_income, forced_regular_income = self.starting.taxable.income(
+            self.plan.allocations(self.age)["taxable"]
+        )
+        forced_regular_income += self.starting.ira.forced(self.age)
+        return forced_capital_income, forced_regular_income
 
     def _calculate_taxable_income(self, expenses):
         """
         Return the amount of taxable income broken up in to capital income, and
         regular income.
         """
-        regular_income = 0
-        capital_income = 0
-
-        needed_extra_income = max(expenses - (regular_income + capital_income), 0)
-        source = self.plan.income_source(self.age, self.starting)
-        capital_income += needed_extra_income * source[0]
-        regular_income += needed_extra_income * source[1]
-
-        capital_income, regular_income = self._adjust_for_forced_income(
-            capital_income, regular_income
+        return taxable_income(
+            expenses,
+            self.plan.income_source(self.age, self.starting),
+            *self._forced_income(),
+            self.plan.roth_conversion(self.age),
         )
 
-        regular_income += self.plan.roth_conversion(self.age)
-        # print(regular_income, capital_gains)
-        return capital_income, regular_income
-
     def _adjust_for_forced_income(self, capital_income, regular_income):
-        """
-        Adjust the taxable income values based on the amount of forced taxable income.
-
-        TODO: Doesn't consider roth as a location to adjust money too, from.
-        """
-        forced_regular_income = 0
-        forced_capital_income = 0
-
-        for acct in (self.starting.taxable, self.starting.ira):
-            if acct.TAX_TYPE == REGULAR_TAX:
-                forced_regular_income += acct.forced(self.age)
-            else:
-                forced_capital_income += acct.forced(self.age)
-
-        if (
-            capital_income < forced_capital_income
-            and regular_income < forced_regular_income
-        ):
-            capital_income = forced_capital_income
-            regular_income = forced_regular_income
-        elif capital_income < forced_capital_income:
-            diff = forced_capital_income - capital_income
-            capital_income = forced_capital_income
-            regular_income = max(regular_income - diff, 0)
-        elif regular_income < forced_regular_income:
-            diff = forced_regular_income - regular_income
-            regular_income = forced_regular_income
-            capital_income = max(capital_income - diff, 0)
-        return capital_income, regular_income
+        return adjust_for_forced_income(
+            capital_income, regular_income, *self._forced_income()
+        )
 
     def _calculate_taxes(self, capital_gains, regular_income):
-        est_fed_taxes = FED_TAX_TABLE.calculate_tax(regular_income)
-        est_state_taxes = STATE_TAX_TABLE.calculate_tax(regular_income + capital_gains)
-        est_capital_taxes = CAPITAL_TAX_TABLE.calculate_tax(
-            capital_gains, regular_income
-        )
-        # print((est_fed_taxes, est_state_taxes, est_capital_taxes))
-        taxes = est_fed_taxes + est_state_taxes + est_capital_taxes
-        return taxes
+        return calculate_taxes(capital_gains, regular_income)
 
     def taxes(self, expenses):
         """
@@ -165,9 +337,14 @@ class Year:
     def __str__(self):
         return f"<Year age:{self.age}, net worth:{self.starting.net_worth}>"
 
-    def _annual_adjustment(self, value) -> float:
-        """Apply inflation adjusted growth to the passed in value"""
-        return value * (1 + self.growth - self.inflation)
+    def _annual_adjustment(self, value, growth=None) -> float:
+        """
+        Apply inflation adjusted growth to the passed in value, the overall
+        portfolio's growth unless an account's ``growth`` is given.
+        """
+        if growth is None:
+            growth = self.growth
+        return value * (1 + growth - self.inflation)
 
     def process_year(
         self, stock_growth: float, bond_growth: float, inflation: float
@@ -177,21 +354,26 @@ class Year:
         self.bond_growth = bond_growth
         self.inflation = inflation
         taxable, ira, roth = (
-            self._annual_adjustment(balance)
-            for balance in self.starting.balances.values()
+            self._annual_adjustment(balance, growth)
+            for balance, growth in zip(
+                self.starting.balances.values(), self.account_growths
+            )
         )
 
         expenses = self.plan.pre_tax_expenses(self.age)
-        print(f"Pre-tax Expenses: ${expenses:,}")
-        taxes = expenses * 0.3
-        for _ in range(7):
-            taxes = self.taxes(expenses + taxes)
-            # print(f"{taxes=}")
+        logger.debug(f"Pre-tax Expenses: ${expenses:,}")
+        source = self.plan.income_source(self.age, self.starting)
+        taxes = estimate_taxes(
+            expenses,
+            source,
+            *self._forced_income(),
+            self.plan.roth_conversion(self.age),
+        )
         total_expenses = expenses + taxes
-        print(f"Taxes: ${taxes:,.2f}")
-        print(f"Total Expenses: ${total_expenses:,.2f}")
+        self.taxes_paid = taxes
+        logger.debug(f"Taxes: ${taxes:,.2f}")
+        logger.debug(f"Total Expenses: ${total_expenses:,.2f}")
 
-        source = self.plan.income_source(self.age, self.starting)
         taxable -= total_expenses * source[0]
         ira -= total_expenses * source[1]
         roth -= total_expenses * source[2]
@@ -215,4 +397,4 @@ class Year:
         age = self.age + 1
         if not self.processed:
             raise ValueError("can only get next after this year has been processed")
-        return self.__class__(age, *self.ending.balances.values())
+        return self.__class__(age, *self.ending.balances.values(), plan=self.plan)
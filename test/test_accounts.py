@@ -8,10 +8,22 @@ def test_balance():
     assert acct.balance == 500
 
 
-def test_taxable_forced():
+def test_taxable_income():
     acct = accounts.TaxableAccount(5000)
     assert acct.balance == 5000
-    assert acct.forced(75) == 5000 * accounts.DIVIDEND_RATE
+    assert acct.forced(75) == 0
+    portfolio = {"stocks": 0.8, "bonds": 0.2}
+    assert acct.income(portfolio) == accounts.holdings_income(5000, portfolio)
+
+
+def test_holdings_income():
+    capital, regular = accounts.holdings_income(
+        1000, {"stocks": 0.5, "bonds": 0.25, "cash": 0.25}
+    )
+    assert capital == pytest.approx(500 * accounts.DIVIDEND_RATE)
+    assert regular == pytest.approx(
+        250 * accounts.BOND_YIELD + 250 * accounts.CASH_RATE
+    )
 
 
 @pytest.mark.parametrize(
@@ -61,3 +73,15 @@ class TestAccounts:
 
         assert accts.net_worth == 680
         assert accts.balances == {"taxable": 300, "ira": 250, "roth": 130}
+
+    @pytest.mark.parametrize(
+        "balances, depleted",
+        [((1, 0, 0), False), ((0, 0, 0), True), ((-300, 200, 99), True)],
+    )
+    def test_is_depleted(self, balances, depleted):
+        accts = accounts.Accounts(
+            accounts.TaxableAccount(balances[0]),
+            accounts.IRAAccount(balances[1]),
+            accounts.RothAccount(balances[2]),
+        )
+        assert accts.is_depleted == depleted
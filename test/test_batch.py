@@ -0,0 +1,171 @@
+import json
+
+import pytest
+
+import retirement.batch as batch
+
+
+@pytest.fixture
+def households(tmp_path):
+    path = tmp_path / "households.csv"
+    path.write_text(
+        "id,age,taxable,ira,roth,need_expenses,ss_age\n"
+        "a,60,500000,800000,100000,,\n"
+        "b,65,300000,300000,50000,30000,67\n"
+        "c,55,1000000,0,0,,\n"
+    )
+    return path
+
+
+def test_read_households_csv(households):
+    records = list(batch.read_households(households))
+    assert len(records) == 3
+    assert records[0] == {
+        "id": "a",
+        "age": "60",
+        "taxable": "500000",
+        "ira": "800000",
+        "roth": "100000",
+    }
+
+
+def test_read_households_jsonl(tmp_path):
+    path = tmp_path / "households.jsonl"
+    path.write_text('{"age": 60, "taxable": 1, "ira": 2, "roth": 3}\n\n')
+    assert list(batch.read_households(path)) == [
+        {"age": 60, "taxable": 1, "ira": 2, "roth": 3}
+    ]
+
+
+class TestParseHousehold:
+    def test_plan_overrides(self):
+        household = batch.parse_household(
+            {"age": "65", "taxable": "1", "ira": "2", "roth": "3", "ss_age": "67"}
+        )
+        assert household == {
+            "age": 65,
+            "taxable": 1.0,
+            "ira": 2.0,
+            "roth": 3.0,
+            "plan": {"ss_age": 67},
+        }
+
+    def test_missing(self):
+        with pytest.raises(ValueError):
+            batch.parse_household({"age": 65, "taxable": 1, "ira": 2})
+
+    @pytest.mark.parametrize(
+        "record",
+        [
+            "not json",
+            {"age": "sixty", "taxable": 1, "ira": 2, "roth": 3},
+            {"age": 65, "taxable": None, "ira": 2, "roth": 3},
+            {"age": 65, "taxable": "nan", "ira": 2, "roth": 3},
+            {"age": 65, "taxable": 1, "ira": 2, "roth": 3, "ss_amount": "inf"},
+            {"age": 1e400, "taxable": 1, "ira": 2, "roth": 3},
+            {"age": 65, "taxable": 1, "ira": 2, "roth": 3, "runs": 0},
+        ],
+    )
+    def test_malformed(self, record):
+        with pytest.raises(ValueError):
+            batch.parse_household(record)
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            batch.parse_household(
+                {"age": 65, "taxable": 1, "ira": 2, "roth": 3, "spending": 4}
+            )
+
+
+def test_run_batch(households, tmp_path):
+    output = tmp_path / "results.jsonl"
+    assert batch.run_batch(households, output, runs=3, chunk_size=2) == 3
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert [r["id"] for r in results] == ["a", "b", "c"]
+    assert all(r["runs"] == 3 for r in results)
+
+
+def test_run_batch_bad_records(tmp_path):
+    source = tmp_path / "households.jsonl"
+    source.write_text(
+        '{"age": 60, "taxable": 1, "ira": 2}\n'
+        "not json\n"
+        '{"age": 60, "taxable": null, "ira": 2, "roth": 3}\n'
+        '{"age": 60, "taxable": 500000, "ira": 500000, "roth": 0}\n'
+    )
+    output = tmp_path / "results.jsonl"
+    assert batch.run_batch(source, output, runs=2) == 4
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert all("error" in r for r in results[:3])
+    assert "error" not in results[3]
+    assert results[3]["runs"] == 2
+    # Resuming past the bad records doesn't redo them.
+    assert batch.run_batch(source, output, runs=2) == 0
+
+
+def test_run_batch_evaluation_error(tmp_path, monkeypatch):
+    source = tmp_path / "households.csv"
+    source.write_text(
+        "id,age,taxable,ira,roth,runs\n"
+        "a,65,nan,1,1,\n"
+        "b,65,100000,100000,100000,0\n"
+        "c,65,100000,100000,100000,\n"
+        "d,60,500000,500000,0,\n"
+    )
+
+    evaluate_household = batch.evaluate_household
+
+    def failing(household, runs):
+        if household["age"] == 65:
+            raise ZeroDivisionError("boom")
+        return evaluate_household(household, runs)
+
+    monkeypatch.setattr(batch, "evaluate_household", failing)
+    output = tmp_path / "results.jsonl"
+    assert batch.run_batch(source, output, runs=2) == 4
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["id"] for r in results] == ["a", "b", "c", "d"]
+    assert "finite" in results[0]["error"]
+    assert "at least 1 run" in results[1]["error"]
+    assert results[2]["error"] == "ZeroDivisionError('boom')"
+    assert "error" not in results[3]
+
+
+def test_run_batch_resume(households, tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"index": 0}\n{"index": 1, "id": "b", "ru')
+
+    assert batch.run_batch(households, output, runs=2) == 2
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert [r.get("id") for r in results] == [None, "b", "c"]
+
+
+@pytest.mark.parametrize("read_size", [1, 4, 7, 1 << 20])
+@pytest.mark.parametrize(
+    "content, lines, kept",
+    [
+        (b"", 0, b""),
+        (b"{}\n{}\n", 2, b"{}\n{}\n"),
+        (b'{}\n{}\n{"ind', 2, b"{}\n{}\n"),
+        (b'{"index": 0', 0, b""),
+    ],
+)
+def test_completed_records(tmp_path, monkeypatch, read_size, content, lines, kept):
+    monkeypatch.setattr(batch, "READ_SIZE", read_size)
+    output = tmp_path / "results.jsonl"
+    output.write_bytes(content)
+    assert batch.completed_records(output) == lines
+    assert output.read_bytes() == kept
+
+
+def test_run_batch_workers(households, tmp_path):
+    output = tmp_path / "results.jsonl"
+    assert batch.run_batch(households, output, workers=2, runs=2) == 3
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["id"] for r in results] == ["a", "b", "c"]
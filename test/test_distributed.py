@@ -0,0 +1,177 @@
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing.connection import Client
+
+import pytest
+
+import retirement
+import retirement.distributed as distributed
+import retirement.mortality as mortality
+import retirement.simulation as simulation
+
+
+def make_mc(**kwargs):
+    options = {"runs": 23, "block_size": 5, "seed": 11}
+    options.update(kwargs)
+    return simulation.MonteCarlo(60, 300000, 600000, 100000, **options)
+
+
+def dying_worker(address):
+    """Take a shard and die without answering."""
+    with Client(address, authkey=distributed.AUTHKEY) as conn:
+        conn.recv()
+        conn.recv()
+        os._exit(1)
+
+
+def stalled_worker(address):
+    """Take a shard and never answer."""
+    with Client(address, authkey=distributed.AUTHKEY) as conn:
+        conn.recv()
+        conn.recv()
+        time.sleep(60)
+
+
+def start_workers(coordinator, targets):
+    processes = [
+        multiprocessing.Process(target=target, args=(coordinator.address,))
+        for target in targets
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def distributed_run(mc, targets, **kwargs):
+    coordinator = distributed.Coordinator(mc, **kwargs)
+    processes = start_workers(coordinator, targets)
+    aggregate = coordinator.start()
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+    return aggregate
+
+
+class TestQuantileSketch:
+    def test_relative_accuracy(self):
+        sketch = distributed.QuantileSketch()
+        values = [-5000, -20, 0, 0, 3, 100, 12345, 999999, 10**7, 42]
+        for value in values:
+            sketch.add(value)
+        ordered = sorted(values)
+        for percentile in range(0, 100, 10):
+            exact = ordered[int(percentile * len(values) / 100)]
+            assert sketch.quantile(percentile) == pytest.approx(
+                exact, rel=distributed.SKETCH_ACCURACY
+            )
+
+    def test_merge_is_order_independent(self):
+        values = list(range(-300, 3000, 7))
+        whole = distributed.QuantileSketch()
+        for value in values:
+            whole.add(value)
+        parts = [distributed.QuantileSketch() for _ in range(3)]
+        for i, value in enumerate(values):
+            parts[i % 3].add(value)
+        merged = distributed.QuantileSketch()
+        for part in reversed(parts):
+            merged.merge(part)
+        assert vars(merged) == vars(whole)
+
+    def test_merge_accuracy(self):
+        with pytest.raises(ValueError):
+            distributed.QuantileSketch(0.01).merge(distributed.QuantileSketch(0.05))
+
+    def test_empty(self):
+        assert distributed.QuantileSketch().quantile(50) is None
+
+
+def test_local_aggregate_matches_monte_carlo():
+    mc = make_mc(lifespan=mortality.Lifespan())
+    aggregate = distributed.local_aggregate(mc)
+    # The simulation keeps room for all its runs.
+    mc.start()
+    summary = aggregate.summary()
+    expected = mc.summary()
+    for key in ("runs", "failures", "death_failures", "success_rate_to_death"):
+        assert summary[key] == expected[key]
+    assert summary["median"] == pytest.approx(
+        expected["median"], rel=distributed.SKETCH_ACCURACY
+    )
+    assert summary["standard_error"] == mc.estimate()["standard_error"]
+    endings = [record.ending.net_worth for record in mc.records]
+    assert summary["mean"] == sum(endings) / len(endings)
+
+
+def test_workers_match_single_process():
+    aggregate = distributed_run(make_mc(), [distributed.run_worker] * 3)
+    expected = distributed.local_aggregate(make_mc())
+    assert aggregate.summary() == expected.summary()
+    assert vars(aggregate.sketch) == vars(expected.sketch)
+    assert aggregate.replicate_results == expected.replicate_results
+    assert (
+        aggregate.failure_distribution.histogram()
+        == expected.failure_distribution.histogram()
+    )
+
+
+def start_coordinator(coordinator):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(coordinator.start()))
+    thread.start()
+    return thread, results
+
+
+def test_dead_worker_shards_are_reassigned():
+    coordinator = distributed.Coordinator(make_mc())
+    thread, results = start_coordinator(coordinator)
+    # Both take a shard before dying, and only then a worker that finishes.
+    for process in start_workers(coordinator, [dying_worker] * 2):
+        process.join()
+    workers = start_workers(coordinator, [distributed.run_worker])
+    thread.join()
+    for process in workers:
+        process.join()
+    assert results[0].summary() == distributed.local_aggregate(make_mc()).summary()
+
+
+def test_stalled_worker_times_out():
+    coordinator = distributed.Coordinator(make_mc(), shard_timeout=1)
+    thread, results = start_coordinator(coordinator)
+    stalled = start_workers(coordinator, [stalled_worker])
+    # Let the stalled worker take the first shard.
+    time.sleep(0.5)
+    workers = start_workers(coordinator, [distributed.run_worker])
+    thread.join()
+    for process in stalled + workers:
+        process.kill()
+    assert results[0].summary() == distributed.local_aggregate(make_mc()).summary()
+
+
+def test_wrong_authkey_is_rejected():
+    coordinator = distributed.Coordinator(make_mc())
+    thread, results = start_coordinator(coordinator)
+    with pytest.raises(multiprocessing.AuthenticationError):
+        Client(coordinator.address, authkey=b"wrong")
+    workers = start_workers(coordinator, [distributed.run_worker])
+    thread.join()
+    for process in workers:
+        process.join()
+    assert results[0].summary() == distributed.local_aggregate(make_mc()).summary()
+
+
+def test_parse_address():
+    assert distributed.parse_address("example.com:7000") == ("example.com", 7000)
+    assert distributed.parse_address(":7000") == ("localhost", 7000)
+
+
+def test_command_line_needs_an_authkey(monkeypatch):
+    parser = retirement.get_parser()
+    monkeypatch.delenv("RETIREMENT_AUTHKEY", raising=False)
+    with pytest.raises(SystemExit):
+        retirement.get_authkey(parser)
+    monkeypatch.setenv("RETIREMENT_AUTHKEY", "secret")
+    assert retirement.get_authkey(parser) == b"secret"
@@ -0,0 +1,119 @@
+import random
+
+import pytest
+
+import retirement.engine as engine
+import retirement.policy as policy
+import retirement.simulation as simulation
+import retirement.year as year
+
+STARTS = [
+    (58, (300000, 700000, 100000)),
+    (62, (50000, 100000, 0)),
+    (70, (200000, 900000, 300000)),
+    (66, (0, 0, 0)),
+]
+
+
+@pytest.fixture
+def paths():
+    rng = random.Random(12)
+    return [
+        simulation.returns_path(
+            [rng.random() for _ in range(3 * simulation.years_to_simulate(age))]
+        )
+        for age, _ in STARTS
+    ]
+
+
+class ConvertingPlan(year.Plan):
+    """Overrides the decisions ``PlanPolicy`` has to take from the plan."""
+
+    def pre_tax_expenses(self, age):
+        return super().pre_tax_expenses(age) + (20000 if age >= 80 else 0)
+
+    def income_source(self, age, starting):
+        if starting.roth.balance > 50000:
+            return (0, 0, 1)
+        return super().income_source(age, starting)
+
+    def roth_conversion(self, age):
+        return 30000 if age < 72 else 0
+
+
+@pytest.mark.parametrize(
+    "plan",
+    [
+        year.Plan(),
+        year.Plan(asset_location={"taxable": {"bonds": 1}}),
+        ConvertingPlan(),
+    ],
+)
+@pytest.mark.parametrize("death_ages, full_horizon", [(None, True), ([80] * 4, False)])
+def test_matches_run(paths, plan, death_ages, full_horizon):
+    cohort = engine.Cohort(
+        policy.PlanPolicy(plan),
+        [age for age, _ in STARTS],
+        [balances for _, balances in STARTS],
+        paths,
+        simulation.MAX_AGE,
+        death_ages,
+        full_horizon,
+    )
+    results = cohort.process()
+    for (age, balances), path, result, death_age in zip(
+        STARTS, paths, results, death_ages or [None] * 4
+    ):
+        run = simulation.Run(
+            age,
+            *balances,
+            plan=plan,
+            returns=path,
+            death_age=death_age,
+            full_horizon=full_horizon,
+        )
+        run.process()
+        assert result.ending.balances == run.ending.balances
+        assert result.last_age == run.last_year.age
+        assert result.depleted_age == run.depleted_age
+        assert result.total_taxes == run.total_taxes
+        assert result.shortfall == run.shortfall
+        assert result.minimum_net_worth == run.minimum_net_worth
+        assert result.is_success == run.is_success
+        assert result.is_success_to_death == run.is_success_to_death
+
+
+def test_finished_runs_are_compacted(paths):
+    class CountingPolicy(policy.PlanPolicy):
+        sizes = []
+
+        def expenses(self, state):
+            self.sizes.append(len(state))
+            return super().expenses(state)
+
+    counting = CountingPolicy()
+    engine.Cohort(
+        counting,
+        [age for age, _ in STARTS],
+        [balances for _, balances in STARTS],
+        paths,
+        simulation.MAX_AGE,
+    ).process()
+    assert counting.sizes[0] == 4
+    # The empty household is done after its first year.
+    assert counting.sizes[1] == 3
+    assert counting.sizes == sorted(counting.sizes, reverse=True)
+
+
+def test_monte_carlo_policy():
+    kwargs = {"runs": 10, "block_size": 5, "seed": 3}
+    by_plan = simulation.MonteCarlo(60, 300000, 600000, 0, **kwargs)
+    by_policy = simulation.MonteCarlo(
+        60, 300000, 600000, 0, policy=policy.PlanPolicy(), **kwargs
+    )
+    by_plan.start()
+    by_policy.start()
+    assert by_plan.summary() == by_policy.summary()
+
+    with pytest.raises(ValueError):
+        simulation.MonteCarlo(60, 1, 2, 3, policy=policy.PlanPolicy(), keep_states=True)
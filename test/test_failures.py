@@ -0,0 +1,54 @@
+import pytest
+
+import retirement.failures as failures
+import retirement.simulation as simulation
+
+
+class FakeRun:
+    def __init__(self, depleted_age=None, shortfall=0, minimum_net_worth=1000):
+        self.depleted_age = depleted_age
+        self.shortfall = shortfall
+        self.minimum_net_worth = minimum_net_worth
+
+
+def test_add():
+    distribution = failures.FailureDistribution()
+    distribution.add(FakeRun(), False)
+    distribution.add(FakeRun(72, 50000, -10), True)
+    distribution.add(FakeRun(74, 30000, -20), True)
+    distribution.add(FakeRun(81, 90000, -5), True)
+    # Depleted after death, so not a failure.
+    distribution.add(FakeRun(90, 0, -1), False)
+    assert distribution.runs == 5
+    assert distribution.failures == 3
+    assert distribution.failure_ages == {72: 1, 74: 1, 81: 1}
+    assert distribution.histogram() == [(70, 74, 2), (80, 84, 1)]
+    assert distribution.histogram(bucket=10) == [(70, 79, 2), (80, 89, 1)]
+    assert distribution.shortfalls.quantile(50) == pytest.approx(50000, rel=0.01)
+    assert distribution.minimum_net_worths.count == 5
+
+
+def test_merge():
+    runs = [(FakeRun(60 + i, 1000 * i, -i), i % 2 == 0) for i in range(1, 20)]
+    whole = failures.FailureDistribution()
+    parts = [failures.FailureDistribution(), failures.FailureDistribution()]
+    for i, (run, failed) in enumerate(runs):
+        whole.add(run, failed)
+        parts[i % 2].add(run, failed)
+    merged = failures.FailureDistribution()
+    for part in parts:
+        merged.merge(part)
+    assert merged.failure_ages == whole.failure_ages
+    assert vars(merged.shortfalls) == vars(whole.shortfalls)
+    assert vars(merged.minimum_net_worths) == vars(whole.minimum_net_worths)
+
+
+def test_monte_carlo_distribution(capsys):
+    mc = simulation.MonteCarlo(60, 300000, 600000, 0, runs=40, seed=5)
+    mc.start()
+    distribution = mc.failure_distribution
+    assert distribution.runs == 40
+    assert distribution.failures == mc.failures
+    assert sum(count for _, _, count in distribution.histogram()) == mc.failures
+    mc.report()
+    assert "Failure ages:" in capsys.readouterr().out
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+import retirement.mortality as mortality
+
+
+@pytest.mark.parametrize("sex", [mortality.MALE, mortality.FEMALE])
+def test_death_probability(sex):
+    assert (
+        0 < mortality.death_probability(sex, 65) < mortality.death_probability(sex, 85)
+    )
+    assert mortality.death_probability(sex, 10) == mortality.death_probability(
+        sex, min(mortality.MORTALITY[sex])
+    )
+    assert mortality.death_probability(sex, 130) == 1
+
+
+def test_sample_death_age():
+    rng = random.Random(1)
+    ages = [mortality.sample_death_age(mortality.FEMALE, 65, rng) for _ in range(500)]
+    assert min(ages) >= 65
+    assert max(ages) <= max(mortality.MORTALITY[mortality.FEMALE])
+    assert 80 < sum(ages) / len(ages) < 95
+
+
+class TestLifespan:
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            mortality.Lifespan(["robot"])
+        with pytest.raises(ValueError):
+            mortality.Lifespan([mortality.MALE], [0, 2])
+
+    def test_joint_outlives_single(self):
+        single = mortality.Lifespan([mortality.MALE])
+        joint = mortality.Lifespan([mortality.MALE, mortality.FEMALE])
+        rng1, rng2 = random.Random(5), random.Random(5)
+        for _ in range(100):
+            assert joint.sample(60, rng1) >= single.sample(60, rng2)
+            # keep the streams aligned for the next pair
+            mortality.sample_death_age(mortality.FEMALE, 60, rng2)
+
+    def test_age_offsets(self):
+        lifespan = mortality.Lifespan([mortality.FEMALE], [-10])
+        rng = random.Random(2)
+        assert all(lifespan.sample(70, rng) >= 70 for _ in range(100))
@@ -0,0 +1,124 @@
+import pytest
+
+import retirement.accounts as accounts
+import retirement.policy as policy
+import retirement.year as year
+
+
+def make_state(ages, balances, last_returns=None, memory=None):
+    return policy.CohortState(
+        list(ages),
+        [b[0] for b in balances],
+        [b[1] for b in balances],
+        [b[2] for b in balances],
+        last_returns or [None] * len(ages),
+        [None] * len(ages),
+        memory or [None] * len(ages),
+    )
+
+
+AGES = [55, 60, 64, 65, 69, 70, 72, 80]
+BALANCES = [
+    (600000, 700000, 800000),
+    (100000, 20000, 500000),
+    (50000, 900000, 0),
+    (80000, 75000, 100000),
+    (0, 0, 0),
+    (1000000, 30000, 60000),
+    (30000, 1000000, 0),
+    (400000, 400000, 400000),
+]
+
+
+class TestPlanPolicy:
+    @pytest.mark.parametrize("plan", [year.Plan(), year.Plan(ss_age=62, ss_amount=1)])
+    def test_matches_plan(self, plan):
+        state = make_state(AGES, [BALANCES[0]] * len(AGES))
+        expenses = policy.PlanPolicy(plan).expenses(state)
+        assert expenses == [plan.pre_tax_expenses(age) for age in AGES]
+
+    def test_income_sources_match_plan(self):
+        plan = year.Plan()
+        for age in AGES:
+            state = make_state([age] * len(BALANCES), BALANCES)
+            sources = policy.PlanPolicy(plan).income_sources(
+                state, [plan.pre_tax_expenses(age)] * len(BALANCES)
+            )
+            expected = [
+                plan.income_source(
+                    age,
+                    accounts.Accounts(
+                        accounts.TaxableAccount(b[0]),
+                        accounts.IRAAccount(b[1]),
+                        accounts.RothAccount(b[2]),
+                    ),
+                )
+                for b in BALANCES
+            ]
+            assert sources == expected
+
+    def test_allocations_and_conversions(self):
+        plan = year.Plan()
+        state = make_state(AGES, BALANCES)
+        plan_policy = policy.PlanPolicy(plan)
+        assert plan_policy.allocations(state) == [plan.allocations(age) for age in AGES]
+        assert plan_policy.conversions(state) == [
+            plan.roth_conversion(age) for age in AGES
+        ]
+
+    def test_asks_once_per_age(self):
+        class CountingPlan(year.Plan):
+            calls = 0
+
+            def pre_tax_expenses(self, age):
+                CountingPlan.calls += 1
+                return super().pre_tax_expenses(age)
+
+        state = make_state([66] * 5 + [70] * 3, BALANCES)
+        expenses = policy.PlanPolicy(CountingPlan()).expenses(state)
+        assert expenses == [year.Plan().pre_tax_expenses(age) for age in state.ages]
+        assert CountingPlan.calls == 2
+
+
+class TestGuardrailPolicy:
+    def expenses(self, balance, multiplier, last_returns=None):
+        state = make_state(
+            [66], [(balance, 0, 0)], last_returns=[last_returns], memory=[multiplier]
+        )
+        expenses = policy.GuardrailPolicy().expenses(state)
+        return expenses[0], state.memory[0]
+
+    def test_first_year(self):
+        assert self.expenses(100000, None) == (60000, 1)
+
+    def test_cut(self):
+        expense, multiplier = self.expenses(500000, 1)
+        assert multiplier == pytest.approx(0.9)
+        assert expense == pytest.approx(54000)
+
+    def test_cut_floor(self):
+        expense, _ = self.expenses(500000, 0.1)
+        assert expense == 60000 - year.WANT_EXPENSES
+
+    def test_raise(self):
+        expense, multiplier = self.expenses(2000000, 1, (0.1, 0.02, 0.02))
+        assert multiplier == pytest.approx(1.1)
+        assert expense == pytest.approx(66000)
+
+    def test_no_raise_after_loss(self):
+        assert self.expenses(2000000, 1, (-0.2, 0.02, 0.02)) == (60000, 1)
+
+    def test_within_guardrails(self):
+        assert self.expenses(1200000, 1) == (60000, 1)
+
+
+def test_portfolio_return():
+    portfolio = {"stocks": 0.5, "bonds": 0.5}
+    assert policy.portfolio_return(portfolio, (0.1, 0.02, 0.03)) == pytest.approx(0.03)
+
+
+def test_settings():
+    settings = policy.GuardrailPolicy(year.Plan(ss_age=67)).settings()
+    assert settings["class"] == "GuardrailPolicy"
+    assert settings["ss_age"] == 67
+    assert settings["upper_rate"] == 0.06
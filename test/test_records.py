@@ -0,0 +1,119 @@
+import pickle
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import retirement.accounts as accounts
+import retirement.records as records
+import retirement.simulation as simulation
+
+
+def processed_runs():
+    runs = []
+    for growth in (0.1, -0.2, 0.0, 0.05):
+        run = simulation.Run(
+            85, 100000, 50000, 0, returns=[(growth, 0.02, 0.03)] * 13, death_age=90
+        )
+        run.process()
+        runs.append(run)
+    return runs
+
+
+def test_rows_match_runs():
+    runs = processed_runs()
+    recorded = records.RunRecords(len(runs))
+    for scenario, run in enumerate(runs):
+        recorded.append(run, scenario)
+    assert len(recorded) == len(runs)
+    for index, (run, record) in enumerate(zip(runs, recorded)):
+        assert record.ending.balances == run.ending.balances
+        assert record.ending.net_worth == run.ending.net_worth
+        assert recorded.net_worth(index) == run.ending.net_worth
+        assert record.depleted_age == run.depleted_age
+        assert record.death_age == 90
+        assert record.total_taxes == run.total_taxes
+        assert record.shortfall == run.shortfall
+        assert record.minimum_net_worth == run.minimum_net_worth
+        assert record.scenario == index
+
+
+def test_percentile_matches_sorted_runs():
+    runs = processed_runs()
+    recorded = records.RunRecords(len(runs))
+    assert recorded.percentile(50) is None
+    for scenario, run in enumerate(runs):
+        recorded.append(run, scenario)
+    ordered = sorted(runs, key=lambda run: run.ending.net_worth)
+    for percentile in (0, 10, 50, 90):
+        expected = ordered[int(percentile * len(runs) / 100)]
+        assert recorded.percentile(percentile).ending.balances == (
+            expected.ending.balances
+        )
+
+
+def test_full():
+    run = processed_runs()[0]
+    recorded = records.RunRecords(1)
+    recorded.append(run, 0)
+    with pytest.raises(IndexError):
+        recorded.append(run, 1)
+    recorded.clear()
+    recorded.append(run, 0)
+    assert len(recorded) == 1
+
+
+def test_total_taxes():
+    run = processed_runs()[0]
+    assert run.total_taxes > 0
+    assert run.total_taxes == sum(run.taxes.values())
+    assert sorted(run.taxes) == list(range(85, simulation.MAX_AGE + 1))
+
+
+def test_pickles_rows_in_use():
+    runs = processed_runs()
+    recorded = records.RunRecords(100000)
+    assert recorded.columns is None
+    assert len(pickle.dumps(recorded)) < 1000
+    for scenario, run in enumerate(runs):
+        recorded.append(run, scenario)
+    assert len(pickle.dumps(recorded)) < 1000
+
+    restored = pickle.loads(pickle.dumps(recorded))
+    assert [r.ending.balances for r in restored] == [
+        r.ending.balances for r in recorded
+    ]
+    restored.append(runs[0], 4)
+    assert len(restored) == 5
+
+
+def test_unstarted_simulation_pickles_small():
+    mc = simulation.MonteCarlo(60, 1, 2, 3, runs=1000000)
+    assert len(pickle.dumps(mc)) < 10000
+
+
+def test_percentile_selection_with_ties():
+    rng = random.Random(5)
+    recorded = records.RunRecords(500)
+    for scenario in range(500):
+        run = simulation.Run(90, 0, 0, 0)
+        run.last_year = SimpleNamespace(
+            ending=accounts.Accounts(
+                accounts.TaxableAccount(rng.choice([-1000, 0, 5.5, 20000])),
+                accounts.IRAAccount(rng.randrange(3) * 1000.25),
+                accounts.RothAccount(0),
+            )
+        )
+        run.minimum_net_worth = run.shortfall = 0
+        recorded.append(run, scenario)
+    order = sorted(range(500), key=recorded.net_worth)
+    for percentile in range(100):
+        assert recorded.percentile(percentile).scenario == order[percentile * 5]
+
+
+@pytest.mark.parametrize("k", range(7))
+def test_select(k):
+    values = [3, 1, 3, 0, 2, 3, 1]
+    value, smaller = records.select(values, k)
+    assert value == sorted(values)[k]
+    assert smaller == sorted(values).index(value)
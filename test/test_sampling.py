@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+import retirement.sampling as sampling
+
+
+@pytest.mark.parametrize("name", sorted(sampling.SAMPLERS))
+def test_uniforms_shape(name):
+    sampler = sampling.get_sampler(name, 6)
+    points = sampler.uniforms(7, random.Random(1))
+    assert len(points) == 7
+    for point in points:
+        assert len(point) == 6
+        assert all(0 <= u <= 1 for u in point)
+
+
+@pytest.mark.parametrize("name", sorted(sampling.SAMPLERS))
+def test_uniforms_reproducible(name):
+    sampler = sampling.get_sampler(name, 4)
+    assert sampler.uniforms(5, random.Random("a")) == sampler.uniforms(
+        5, random.Random("a")
+    )
+
+
+def test_get_sampler_unknown():
+    with pytest.raises(ValueError):
+        sampling.get_sampler("sobol", 3)
+
+
+def test_antithetic_pairs():
+    points = sampling.AntitheticSampler(3).uniforms(5, random.Random(2))
+    for first, second in (points[0:2], points[2:4]):
+        assert [a + b for a, b in zip(first, second)] == pytest.approx([1, 1, 1])
+
+
+def test_stratified_hits_every_stratum():
+    points = sampling.StratifiedSampler(3).uniforms(10, random.Random(3))
+    for dim in range(3):
+        assert sorted(int(p[dim] * 10) for p in points) == list(range(10))
+
+
+def test_primes():
+    assert sampling.primes(8) == [2, 3, 5, 7, 11, 13, 17, 19]
+
+
+@pytest.mark.parametrize(
+    "index, base, value",
+    [(1, 2, 0.5), (2, 2, 0.25), (3, 2, 0.75), (5, 3, 2 / 3 + 1 / 9)],
+)
+def test_radical_inverse(index, base, value):
+    assert sampling.radical_inverse(index, base) == pytest.approx(value)
@@ -0,0 +1,71 @@
+import pytest
+
+import retirement.sensitivity as sensitivity
+import retirement.simulation as simulation
+import retirement.year as year
+
+
+@pytest.fixture
+def mc():
+    return simulation.MonteCarlo(
+        62, 300000, 500000, 50000, runs=10, block_size=5, seed=21
+    )
+
+
+def test_median():
+    assert sensitivity.median([5, 1, 3, 2]) == 3
+
+
+def test_report(mc):
+    report = sensitivity.Sensitivity(mc).start()
+    assert set(report) == {"base"} | set(sensitivity.STEPS)
+    assert report["taxable"]["step"] == sensitivity.BALANCE_STEP
+    assert report["taxable"]["success_rate"] >= 0
+    assert report["need_expenses"]["success_rate"] <= 0
+    assert report["need_expenses"]["median"] < 0
+
+
+@pytest.mark.parametrize(
+    "name, kwargs",
+    [
+        ("ss_amount", {"plan": year.Plan(ss_amount=year.SS_AMOUNT)}),
+        ("roth", {"roth": 150000}),
+        ("age", {"age": 63}),
+    ],
+)
+def test_matches_separate_simulation(mc, name, kwargs):
+    steps = {name: sensitivity.STEPS[name]}
+    if name == "ss_amount":
+        kwargs["plan"].ss_amount += steps[name]
+    report = sensitivity.Sensitivity(mc, steps).start()
+
+    base = simulation.MonteCarlo(
+        62, 300000, 500000, 50000, runs=10, block_size=5, seed=21
+    )
+    base.start()
+    options = {"age": 62, "taxable": 300000, "ira": 500000, "roth": 50000}
+    options.update(kwargs)
+    perturbed = simulation.MonteCarlo(runs=10, block_size=5, seed=21, **options)
+    if name == "age":
+        # Same scenarios, shifted one year in.
+        perturbed.block_scenarios = lambda index, size: [
+            (returns[1:], death_age)
+            for returns, death_age in base.block_scenarios(index, size)
+        ]
+    perturbed.start()
+
+    assert report["base"]["success_rate"] == 1 - base.failures / 10
+    assert report[name]["success_rate"] == pytest.approx(
+        (base.failures - perturbed.failures) / 10
+    )
+    assert report[name]["median"] == (
+        perturbed.get_nth_percentile_run(50).ending.net_worth
+        - base.get_nth_percentile_run(50).ending.net_worth
+    )
+
+
+def test_no_years_left_to_retire_later():
+    mc = simulation.MonteCarlo(simulation.MAX_AGE, 300000, 500000, 50000, runs=5)
+    report = sensitivity.Sensitivity(mc).start()
+    assert "age" not in report
+    assert set(report) == {"base"} | set(sensitivity.STEPS) - {"age"}
@@ -0,0 +1,266 @@
+import pytest
+
+import retirement.mortality as mortality
+import retirement.simulation as simulation
+import retirement.year as year
+
+
+@pytest.mark.parametrize("u, value", [(0, 1), (0.24, 1), (0.25, 2), (0.99, 4), (1, 4)])
+def test_empirical_quantile(u, value):
+    assert simulation.empirical_quantile([1, 2, 3, 4], u) == value
+
+
+def test_returns_path():
+    path = simulation.returns_path([0, 0, 0, 1, 1, 1])
+    assert path == [
+        (
+            min(simulation.ALL_STOCK_GROWTH) / 100,
+            min(simulation.ALL_BOND_GROWTH) / 100,
+            min(simulation.ALL_INFLATION) / 100,
+        ),
+        (
+            max(simulation.ALL_STOCK_GROWTH) / 100,
+            max(simulation.ALL_BOND_GROWTH) / 100,
+            max(simulation.ALL_INFLATION) / 100,
+        ),
+    ]
+
+
+def test_run_with_returns():
+    returns = [(0.05, 0.02, 0.03)] * simulation.years_to_simulate(90)
+    run1 = simulation.Run(90, 100000, 200000, 300000, returns=returns)
+    run2 = simulation.Run(90, 100000, 200000, 300000, returns=returns)
+    run1.process()
+    run2.process()
+    assert run1.last_year.age == simulation.MAX_AGE
+    assert run1.ending.balances == run2.ending.balances
+
+
+class TestMonteCarlo:
+    def test_block_sizes(self):
+        mc = simulation.MonteCarlo(90, 1, 2, 3, runs=23, block_size=5)
+        assert mc.block_sizes() == [5, 5, 5, 5, 3]
+
+    @pytest.mark.parametrize("sampling", ["plain", "antithetic", "halton"])
+    def test_seeded(self, sampling):
+        results = []
+        for _ in range(2):
+            mc = simulation.MonteCarlo(
+                85, 100000, 200000, 50000, runs=12, sampling=sampling, seed=7
+            )
+            mc.start()
+            results.append([r.ending.net_worth for r in mc.records])
+        assert results[0] == results[1]
+        assert len(results[0]) == 12
+
+    def test_variance_report(self):
+        mc = simulation.MonteCarlo(
+            85, 100000, 200000, 50000, runs=20, block_size=5, seed=3
+        )
+        assert mc.variance_report() is None
+        mc.start()
+        report = mc.variance_report()
+        assert report["sampling"] == "plain"
+        assert report["failure_rate"] == mc.failures / 20
+        assert len(mc.replicate_results) == 4
+
+    def test_checkpoint_resume(self, tmp_path):
+        checkpoint = tmp_path / "mc.pickle"
+        args = (85, 100000, 200000, 50000)
+        kwargs = {"runs": 12, "block_size": 5, "seed": 9}
+
+        interrupted = simulation.MonteCarlo(*args, **kwargs)
+        interrupted.process_block(0, 5)
+        interrupted.save_checkpoint(checkpoint)
+
+        resumed = simulation.MonteCarlo(*args, **kwargs)
+        estimate = resumed.start(checkpoint=checkpoint)
+        assert estimate["complete"]
+
+        uninterrupted = simulation.MonteCarlo(*args, **kwargs)
+        uninterrupted.start()
+        assert [r.ending.balances for r in resumed.records] == [
+            r.ending.balances for r in uninterrupted.records
+        ]
+        assert resumed.failures == uninterrupted.failures
+        assert (
+            resumed.failure_distribution.failure_ages
+            == uninterrupted.failure_distribution.failure_ages
+        )
+
+        other = simulation.MonteCarlo(*args, runs=12, block_size=5, seed=10)
+        with pytest.raises(ValueError):
+            other.start(checkpoint=checkpoint)
+
+    @pytest.mark.parametrize(
+        "changed",
+        [{"keep_states": True}, {"plan": type("OtherPlan", (year.Plan,), {})()}],
+    )
+    def test_checkpoint_mismatch(self, tmp_path, changed):
+        checkpoint = tmp_path / "mc.pickle"
+        args = (85, 100000, 200000, 50000)
+        kwargs = {"runs": 10, "block_size": 5, "seed": 9, "plan": year.Plan()}
+        simulation.MonteCarlo(*args, **kwargs).start(checkpoint=checkpoint)
+
+        kwargs.update(changed)
+        with pytest.raises(ValueError):
+            simulation.MonteCarlo(*args, **kwargs).start(checkpoint=checkpoint)
+
+    def test_time_budget_checkpoint(self, tmp_path):
+        checkpoint = tmp_path / "mc.pickle"
+        args = (60, 500000, 500000, 0)
+        kwargs = {"runs": 200, "block_size": 5, "seed": 2}
+
+        interrupted = simulation.MonteCarlo(*args, **kwargs)
+        estimate = interrupted.start(checkpoint=checkpoint, time_budget=0.05)
+        assert not estimate["complete"]
+        assert checkpoint.exists()
+
+        resumed = simulation.MonteCarlo(*args, **kwargs)
+        assert resumed.load_checkpoint(checkpoint)
+        assert len(resumed.records) == 5 * resumed.completed_blocks
+        assert resumed.start(checkpoint=checkpoint)["complete"]
+
+        uninterrupted = simulation.MonteCarlo(*args, **kwargs)
+        uninterrupted.start()
+        assert resumed.summary() == uninterrupted.summary()
+        assert resumed.replicate_results == uninterrupted.replicate_results
+
+    def test_time_budget(self):
+        mc = simulation.MonteCarlo(60, 500000, 500000, 0, runs=100000, seed=1)
+        estimate = mc.start(time_budget=0.1)
+        assert not estimate["complete"]
+        assert 0 < estimate["runs"] < 100000
+        low, high = estimate["confidence_interval"]
+        assert low <= estimate["failure_rate"] <= high
+
+    def test_rerun_after_time_budget(self):
+        mc = simulation.MonteCarlo(
+            60, 500000, 500000, 0, runs=20, block_size=7, seed=1, keep_states=True
+        )
+        mc.process_block(0, 7)
+        # What start() keeps of a block the deadline cut short.
+        mc.add_block(1, mc.simulate_block(1, 7)[:3], complete=False)
+        mc.rerun(year.Plan(ss_age=67))
+        assert len(mc.records) == len(mc.runs) == 10
+        assert mc.failure_distribution.runs == 10
+        assert mc.failures == sum(run.is_success is False for run in mc.runs)
+        assert mc.completed_blocks == len(mc.replicate_results) == 1
+
+    def test_time_budget_before_first_run(self, capsys):
+        mc = simulation.MonteCarlo(60, 500000, 500000, 0, runs=10, seed=1)
+        assert mc.start(time_budget=1e-9) is None
+        assert mc.summary() is None
+        mc.report()
+        assert "number of runs: 0" in capsys.readouterr().out
+
+
+class TestRunHorizon:
+    returns = [(0.05, 0.02, 0.03)] * simulation.years_to_simulate(60)
+
+    def test_stops_when_depleted(self):
+        run = simulation.Run(60, 50000, 0, 0, returns=self.returns)
+        run.process()
+        assert run.depleted_age == 60
+        assert run.last_year.age == 60
+        assert run.is_success is False
+        assert run.is_success_to_death is False
+        overdrawn = -sum(run.ending.balances.values())
+        assert run.minimum_net_worth == -overdrawn
+        assert run.shortfall == overdrawn + sum(
+            run.plan.pre_tax_expenses(age) for age in range(61, simulation.MAX_AGE + 1)
+        )
+
+    def test_stops_at_death(self):
+        run = simulation.Run(
+            60, 2000000, 0, 0, returns=self.returns, death_age=70, full_horizon=False
+        )
+        run.process()
+        assert run.last_year.age == 70
+        assert run.is_success is None
+        assert run.is_success_to_death is True
+        assert run.shortfall == 0
+        assert 0 < run.minimum_net_worth < 2000000
+
+    def test_full_horizon(self):
+        run = simulation.Run(60, 800000, 0, 0, returns=self.returns, death_age=70)
+        run.process()
+        assert run.last_year.age == run.depleted_age
+        assert run.depleted_age > 70
+        assert run.is_success is False
+        assert run.is_success_to_death is True
+        # Money ran out after the household died.
+        assert run.shortfall == 0
+        assert run.minimum_net_worth <= 0
+
+
+def test_monte_carlo_lifespan():
+    lifespan = mortality.Lifespan([mortality.MALE])
+    mc = simulation.MonteCarlo(
+        80, 100000, 200000, 0, runs=10, seed=4, lifespan=lifespan, full_horizon=False
+    )
+    mc.start()
+    summary = mc.summary()
+    assert summary["success_rate"] is None
+    assert summary["death_failures"] == mc.death_failures
+    assert all(run.death_age >= 80 for run in mc.records)
+
+
+class TestRerun:
+    args = (60, 600000, 700000, 100000)
+    kwargs = {"runs": 10, "block_size": 5, "seed": 11}
+
+    def test_process_from_age(self):
+        returns = [(0.05, 0.02, 0.03)] * simulation.years_to_simulate(60)
+        run = simulation.Run(*self.args, returns=returns, keep_states=True)
+        run.process()
+        assert sorted(run.states) == list(range(60, simulation.MAX_AGE + 1))
+        ending = run.ending.balances
+
+        run.process(75)
+        assert run.ending.balances == ending
+
+        run.plan = simulation.Plan(ss_age=67)
+        run.process(67)
+        other = simulation.Run(
+            *self.args, plan=simulation.Plan(ss_age=67), returns=returns
+        )
+        other.process()
+        assert run.ending.balances == other.ending.balances
+
+    def test_process_from_age_without_states(self):
+        run = simulation.Run(*self.args, returns=[(0.05, 0.02, 0.03)] * 40)
+        run.process()
+        with pytest.raises(ValueError):
+            run.process(70)
+
+    def test_rerun(self):
+        mc = simulation.MonteCarlo(*self.args, keep_states=True, **self.kwargs)
+        mc.start()
+        plan = simulation.Plan(ss_age=67)
+        assert mc.rerun(plan) == 67
+
+        fresh = simulation.MonteCarlo(*self.args, plan=plan, **self.kwargs)
+        fresh.start()
+        assert [r.ending.balances for r in mc.records] == [
+            r.ending.balances for r in fresh.records
+        ]
+        assert mc.failures == fresh.failures
+        assert mc.replicate_results == fresh.replicate_results
+        assert [(r.shortfall, r.minimum_net_worth) for r in mc.records] == [
+            (r.shortfall, r.minimum_net_worth) for r in fresh.records
+        ]
+        assert vars(mc.failure_distribution.shortfalls) == vars(
+            fresh.failure_distribution.shortfalls
+        )
+
+    def test_rerun_unchanged(self):
+        mc = simulation.MonteCarlo(*self.args, keep_states=True, **self.kwargs)
+        mc.start()
+        assert mc.rerun(simulation.Plan()) is None
+
+    def test_rerun_needs_states(self):
+        mc = simulation.MonteCarlo(*self.args, **self.kwargs)
+        mc.start()
+        with pytest.raises(ValueError):
+            mc.rerun(simulation.Plan(ss_age=67))
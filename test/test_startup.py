@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Seconds ``import retirement`` may take, the best of a few tries.
+IMPORT_BUDGET = 0.05
+IMPORT_TRIES = 3
+
+
+def run_python(code, cwd):
+    """Run ``code`` in a fresh interpreter and return what it printed as JSON."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_import_budget(tmp_path):
+    code = (
+        "import json, time\n"
+        "start = time.perf_counter()\n"
+        "import retirement\n"
+        "print(json.dumps(time.perf_counter() - start))\n"
+    )
+    elapsed = min(run_python(code, tmp_path) for _ in range(IMPORT_TRIES))
+    assert elapsed < IMPORT_BUDGET
+
+
+def test_import_defers_work(tmp_path):
+    code = (
+        "import json, sys\n"
+        "import retirement\n"
+        "loaded = sorted(sys.modules)\n"
+        "import retirement.simulation as simulation, retirement.tax as tax\n"
+        "print(json.dumps({\n"
+        "    'loaded': loaded,\n"
+        "    'data': simulation.load_data.cache_info().currsize,\n"
+        "    'tables': [name for name in tax.TAX_TABLES if name in vars(tax)],\n"
+        "}))\n"
+    )
+    result = run_python(code, tmp_path)
+    for module in (
+        "retirement.simulation",
+        "retirement.batch",
+        "retirement.distributed",
+        "multiprocessing",
+        "socket",
+    ):
+        assert module not in result["loaded"]
+    assert result["data"] == 0
+    assert result["tables"] == []
+
+
+def test_data_found_from_any_directory(tmp_path):
+    code = (
+        "import json, random\n"
+        "import retirement.mortality as mortality\n"
+        "import retirement.simulation as simulation\n"
+        "print(json.dumps([\n"
+        "    simulation.returns_path([0.5, 0.5, 0.5]),\n"
+        "    mortality.sample_death_age(mortality.MALE, 60, random.Random(1)),\n"
+        "]))\n"
+    )
+    path, death_age = run_python(code, tmp_path)
+    assert len(path) == 1
+    assert death_age >= 60
@@ -37,16 +37,26 @@ class TestYear:
         yr.stock_growth = 0.3
         yr.bond_growth = 0.2
         yr.inflation = 0.05
-        growth = 0.3 * 0.75 + 0.2 * 0.2
-        assert yr.growth == growth
-        assert yr._annual_adjustment(1000) == 1000 * (1 + growth - 0.05)
+        growth = 0.3 * 0.75 + 0.2 * 0.2 + year.CASH_RATE * 0.05
+        assert yr.growth == pytest.approx(growth)
+        assert yr.account_growths == (yr.growth,) * 3
+        assert yr._annual_adjustment(1000) == pytest.approx(1000 * (1 + growth - 0.05))
+
+    def test_asset_location(self):
+        plan = year.Plan(asset_location={"ira": {"bonds": 1}, "roth": {"stocks": 1}})
+        yr = year.Year(52, 100, 100, 100, plan=plan)
+        yr.process_year(0.3, 0.2, 0.05)
+        assert yr.account_growths == (yr.growth, 0.2, 0.3)
+        # Expenses come out of the taxable account before 60.
+        assert yr.ending.ira.balance == pytest.approx(115)
+        assert yr.ending.roth.balance == pytest.approx(125)
 
     @pytest.mark.parametrize(
         "age, source, results",
         [
-            (65, [0, 1, 0], (9000, 41000)),
+            (65, [0, 1, 0], (6750, 43250)),
             (65, [0.5, 0.5, 0], (25000, 25000)),
-            (65, [0.1, 0.5, 0.4], (9000, 21000)),
+            (65, [0.1, 0.5, 0.4], (6750, 23250)),
         ],
     )
     def test_calculate_income(self, age, source, results):
@@ -59,9 +69,9 @@ class TestYear:
     @pytest.mark.parametrize(
         "input_income, results",
         [
-            ((0, 50000), (9000, 41000)),
+            ((0, 50000), (6750, 43250)),
             ((25000, 25000), (25000, 25000)),
-            ((50000, 0), (50000, 0)),
+            ((50000, 0), (44900, 5100)),
         ],
     )
     def test_adjust_for_forced_income(self, input_income, results):
@@ -80,3 +90,32 @@ class TestYear:
     def test_calculate_taxes(self, input_income, taxes):
         yr = year.Year(60, 600000, 700000, 800000)
         assert yr._calculate_taxes(*input_income) == pytest.approx(taxes)
+
+
+class TestPlan:
+    @pytest.mark.parametrize(
+        "kwargs, age",
+        [
+            ({}, None),
+            ({"ss_age": 67}, 67),
+            ({"ss_age": 72}, 70),
+            ({"medicare_premiums": 6000}, 65),
+            ({"want_expenses": 0}, 55),
+            ({"asset_location": {"roth": {"stocks": 1}}}, 55),
+        ],
+    )
+    def test_first_difference(self, kwargs, age):
+        plan = year.Plan()
+        assert plan.first_difference(year.Plan(**kwargs), range(55, 98)) == age
+
+    def test_allocations(self):
+        portfolio = {"stocks": 1}
+        allocations = year.Plan(asset_location={"roth": portfolio}).allocations(60)
+        assert allocations == {
+            "taxable": year.Plan().portfolio(60),
+            "ira": year.Plan().portfolio(60),
+            "roth": portfolio,
+        }
+
+    def test_first_difference_other_class(self):
+        assert year.Plan().first_difference(FakePlan(), range(55, 98)) == 55